@@ -0,0 +1,65 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+
+LOCK_KEY = 'core:render:{}'
+# Лок переживёт упавший воркер не дольше этого.
+LOCK_TIMEOUT: int = 10
+# Дольше ждать соседа бессмысленно: проще отрисовать самим.
+WAIT_TIMEOUT: float = 5
+POLL_INTERVAL: float = 0.05
+MAX_POLL_INTERVAL: float = 0.5
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def wait_for(key, lock_key, deadline):
+    """Ждёт, пока другой воркер положит key в кэш или отпустит лок."""
+    delay = POLL_INTERVAL
+    while time.monotonic() < deadline:
+        time.sleep(delay)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            return None
+        delay = min(delay * 2, MAX_POLL_INTERVAL)
+    return None
+
+
+@contextmanager
+def single_flight(key):
+    """Одна отрисовка значения key на все потоки и воркеры.
+
+    Отдаёт значение, если его успел положить в кэш другой запрос,
+    иначе None: тогда вызывающий считает значение и кладёт его
+    в кэш сам. Потоки процесса ждут своего первого на Event,
+    воркеры — друг друга через лок в кэше. Дольше WAIT_TIMEOUT
+    никто не ждёт.
+    """
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    with _inflight_lock:
+        event = _inflight.get(key)
+        leader = event is None
+        if leader:
+            event = _inflight[key] = threading.Event()
+    if not leader:
+        event.wait(WAIT_TIMEOUT)
+        yield cache.get(key)
+        return
+    lock_key = LOCK_KEY.format(key)
+    try:
+        if cache.add(lock_key, 1, LOCK_TIMEOUT):
+            try:
+                yield None
+            finally:
+                cache.delete(lock_key)
+        else:
+            yield wait_for(key, lock_key, deadline)
+    finally:
+        with _inflight_lock:
+            del _inflight[key]
+        event.set()
@@ -0,0 +1,164 @@
+import hashlib
+import re
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from . import routers
+from .coalescing import single_flight
+
+GENERATION_KEY = 'core:pages:generation'
+HOLE_MARKER = '<!--hole:{}-->'
+PLACEHOLDER = '<!--placeholder:{}:{}-->'
+PLACEHOLDER_RE = re.compile(r'<!--placeholder:(\w+):(\w+)-->')
+
+placeholder_renderers = {}
+
+
+def page_generation():
+    """Текущее поколение закэшированных страниц."""
+    return cache.get_or_set(GENERATION_KEY, _new_generation, None)
+
+
+def invalidate_pages():
+    """Сбрасывает все закэшированные страницы разом."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _new_generation(), None)
+
+
+def _new_generation():
+    # Начинаем со времени, чтобы после вытеснения ключа
+    # не вернуться к поколению, страницы которого ещё в кэше.
+    return int(time.time() * 1000)
+
+
+def page_key(request):
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return 'core:page:{}:{}'.format(page_generation(), path)
+
+
+def render_hole(request, template_name, context):
+    """Отрисовывает «дырку» — небольшой фрагмент, зависящий от юзера."""
+    holes = getattr(request, 'page_holes', None)
+    if holes is None:
+        return mark_safe(render_to_string(template_name, context, request))
+    holes.append((template_name, context))
+    return mark_safe(HOLE_MARKER.format(len(holes) - 1))
+
+
+def fill_holes(request, content, holes):
+    for index, (template_name, context) in enumerate(holes):
+        content = content.replace(
+            HOLE_MARKER.format(index),
+            render_to_string(template_name, context, request),
+        )
+    return content
+
+
+def placeholder_renderer(name):
+    """Регистрирует функцию, которая отрисовывает метки одного типа.
+
+    Функция получает запрос и множество ключей всех меток страницы
+    и возвращает словарь {ключ: html}, так что данные для всей
+    страницы выбираются одним запросом.
+    """
+    def decorator(func):
+        placeholder_renderers[name] = func
+        return func
+    return decorator
+
+
+def fill_placeholders(request, content):
+    """Заменяет метки {% placeholder %} пользовательскими фрагментами.
+
+    Метки зависят только от ключа, поэтому их можно класть в любой
+    кэш: в карточки постов, фрагменты шаблонов и целые страницы.
+    """
+    keys = defaultdict(set)
+    for name, key in PLACEHOLDER_RE.findall(content):
+        keys[name].add(key)
+    rendered = {}
+    for name, batch in keys.items():
+        for key, html in placeholder_renderers[name](request, batch).items():
+            rendered[PLACEHOLDER.format(name, key)] = html
+    return PLACEHOLDER_RE.sub(
+        lambda match: rendered.get(match.group(0), ''), content)
+
+
+def with_placeholders(view):
+    """Заполняет метки в ответе представления."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if not response.streaming and response.status_code == 200:
+            response.content = fill_placeholders(
+                request, response.content.decode(response.charset))
+        return response
+    return wrapper
+
+
+def render_page(view, request, *args, **kwargs):
+    """Отрисовывает общую часть страницы, собирая её дырки.
+
+    Для потокового ответа вместо (content, holes) отдаёт None.
+    """
+    request.page_holes = []
+    try:
+        response = view(request, *args, **kwargs)
+    finally:
+        holes = request.page_holes
+        del request.page_holes
+    if response.streaming:
+        return response, None
+    return response, (response.content.decode(response.charset), holes)
+
+
+def compose_page(view):
+    """Кэширует страницу целиком, кроме «дырок».
+
+    Общая для всех пользователей часть страницы сохраняется в кэш
+    вместе со списком дырок, а шапка, кнопки подписки и прочие
+    пользовательские фрагменты отрисовываются на каждый запрос.
+
+    Страницу для кэша читаем из основной БД: отставшая реплика
+    закэшировала бы старые данные уже после сброса поколения.
+    Клиент, закреплённый за основной БД, кэш обходит и видит
+    свои правки сразу.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        timeout = settings.PAGE_CACHE_TIMEOUT
+        if (request.method != 'GET' or not timeout
+                or routers.is_pinned()):
+            return with_placeholders(view)(request, *args, **kwargs)
+        key = page_key(request)
+        page = cache.get(key)
+        response = HttpResponse()
+        if page is None:
+            # Одинаковые запросы, пришедшие разом, ждут первого из них.
+            with single_flight(key) as page:
+                if page is None:
+                    with routers.read_primary():
+                        response, page = render_page(
+                            view, request, *args, **kwargs)
+                    if page is None:
+                        return response
+                    # private — страница для одного пользователя,
+                    # например предпросмотр черновика автором.
+                    if (response.status_code == 200
+                            and 'private' not in response.get(
+                                'Cache-Control', '')):
+                        cache.set(key, page, timeout)
+        content, holes = page
+        content = fill_holes(request, content, holes)
+        response.content = fill_placeholders(request, content)
+        return response
+    return wrapper
@@ -0,0 +1,43 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.routers import replicas
+
+
+def copy_database(source, target):
+    """Снимок SQLite-базы через backup API: читатели не видят полкопии."""
+    with closing(sqlite3.connect(source)) as src:
+        with closing(sqlite3.connect(target)) as dst:
+            src.backup(dst)
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную SQLite-базу в реплики (замена репликации)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые столько секунд; 0 — один раз',
+        )
+
+    def handle(self, *args, **options):
+        if not replicas():
+            raise CommandError('Реплики не настроены: задайте YATUBE_REPLICAS')
+        databases = [settings.DATABASES['default']] + [
+            settings.DATABASES[alias] for alias in replicas()]
+        if any('sqlite3' not in db['ENGINE'] for db in databases):
+            raise CommandError('Команда работает только с SQLite')
+        while True:
+            for alias in replicas():
+                copy_database(
+                    settings.DATABASES['default']['NAME'],
+                    settings.DATABASES[alias]['NAME'],
+                )
+            self.stdout.write(f'Реплик обновлено: {len(replicas())}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
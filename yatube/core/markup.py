@@ -0,0 +1,108 @@
+import html
+import re
+
+# Меняется при любом изменении вывода: rerender_posts перерисует
+# посты с другой версией.
+RENDERER_VERSION: int = 1
+
+FENCE = '```'
+BLOCKS = (
+    ('ul', re.compile(r'^\s*[-*]\s+(.*)$')),
+    ('ol', re.compile(r'^\s*\d+[.)]\s+(.*)$')),
+    ('blockquote', re.compile(r'^\s*>\s?(.*)$')),
+)
+INLINE = re.compile(
+    r'`(?P<code>[^`\n]+)`'
+    r'|\[(?P<label>[^\]\n]+)\]\((?P<href>https?://[^\s)]+)\)'
+    r'|(?P<url>https?://[^\s<>"]+)'
+)
+STRONG = re.compile(r'\*\*(?=\S)([^<]+?)(?<=\S)\*\*')
+EMPHASIS = re.compile(r'(?<![\w*])([*_])(?=\S)([^<]+?)(?<=\S)\1(?![\w*])')
+# Знаки препинания в конце адреса обычно относятся к предложению.
+URL_TRAILING = '.,:;!?)]\'"'
+
+
+def emphasis(text):
+    text = html.escape(text)
+    text = STRONG.sub(r'<strong>\1</strong>', text)
+    return EMPHASIS.sub(r'<em>\2</em>', text)
+
+
+def link(url, label):
+    return '<a href="{}" rel="nofollow noopener">{}</a>'.format(
+        html.escape(url), label)
+
+
+def inline(text):
+    parts, position = [], 0
+    for match in INLINE.finditer(text):
+        parts.append(emphasis(text[position:match.start()]))
+        position = match.end()
+        if match['code'] is not None:
+            parts.append('<code>{}</code>'.format(html.escape(match['code'])))
+        elif match['href'] is not None:
+            parts.append(link(match['href'], emphasis(match['label'])))
+        else:
+            url = match['url'].rstrip(URL_TRAILING)
+            position = match.start() + len(url)
+            parts.append(link(url, html.escape(url)))
+    parts.append(emphasis(text[position:]))
+    return ''.join(parts)
+
+
+def line_kind(line):
+    for kind, pattern in BLOCKS:
+        match = pattern.match(line)
+        if match:
+            return kind, match.group(1)
+    return 'p', line
+
+
+def render_block(kind, lines):
+    if kind in ('ul', 'ol'):
+        items = ''.join('<li>{}</li>'.format(inline(line)) for line in lines)
+        return '<{0}>{1}</{0}>'.format(kind, items)
+    body = '<p>{}</p>'.format('<br>\n'.join(inline(line) for line in lines))
+    if kind == 'blockquote':
+        return '<blockquote>{}</blockquote>'.format(body)
+    return body
+
+
+def render(text):
+    """HTML поста из безопасного подмножества Markdown.
+
+    Абзацы и переносы строк, **жирный**, *курсив* и _курсив_, `код`,
+    блоки кода в ```, цитаты через >, списки через - и 1., ссылки
+    [текст](https://...) и голые http(s)-адреса. Текст пользователя
+    экранируется до того, как к нему добавляется разметка, поэтому
+    сырой HTML из поста в страницу не попадает. Модуль не зависит
+    от Django: его вызывают и в процессах пула rerender_posts.
+    """
+    blocks, kind, lines = [], None, []
+
+    def flush():
+        if lines:
+            blocks.append(render_block(kind, lines))
+            lines.clear()
+
+    source = iter(text.replace('\r\n', '\n').replace('\r', '\n').split('\n'))
+    for line in source:
+        if line.strip().startswith(FENCE):
+            flush()
+            code = []
+            for line in source:
+                if line.strip().startswith(FENCE):
+                    break
+                code.append(line)
+            blocks.append('<pre><code>{}</code></pre>'.format(
+                html.escape('\n'.join(code))))
+        elif not line.strip():
+            flush()
+        else:
+            new_kind, content = line_kind(line)
+            if new_kind != kind:
+                flush()
+                kind = new_kind
+            lines.append(content)
+    flush()
+    return '\n'.join(blocks)
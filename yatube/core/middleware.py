@@ -0,0 +1,183 @@
+import logging
+import re
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from . import routers
+from .storage import acceptable_encodings, brotli
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml)|image/svg\+xml)')
+# Ответы меньше этого размера сжимать невыгодно.
+COMPRESSION_MIN_SIZE: int = 200
+# Поток сбрасывается клиенту не чаще, чем раз на столько байт входа:
+# flush на каждом мелком куске портит степень сжатия.
+COMPRESSION_STREAM_FLUSH_SIZE: int = 16 * 1024
+# Такие потоки клиент ждёт по событию — их сбрасываем на каждом куске.
+LIVE_STREAM_TYPES = ('text/event-stream',)
+SERVER_TIMING = 'compress;dur={:.2f};desc="{} {:.2f}"'
+PIN_COOKIE = 'pin_primary'
+# Столько секунд после записи клиент читает из основной БД.
+PIN_SECONDS: int = 10
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self):
+        # wbits=31: формат gzip с заголовком и контрольной суммой.
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self):
+        # Средний уровень: максимальный слишком медленный для ответов.
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def choose_compressor(request):
+    available = {GzipCompressor.encoding: GzipCompressor}
+    if brotli is not None:
+        available = {BrotliCompressor.encoding: BrotliCompressor, **available}
+    for encoding in acceptable_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), available):
+        return available[encoding]
+    return None
+
+
+class CompressionMiddleware:
+    """Сжимает ответы в Brotli или gzip.
+
+    Маленькие и уже сжатые ответы пропускает, потоковые ответы
+    сжимает по кусочкам, не дожидаясь конца потока, и отдаёт
+    клиенту порциями от COMPRESSION_STREAM_FLUSH_SIZE. Степень сжатия
+    и затраченное время пишутся в заголовок Server-Timing и в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(
+            settings, 'COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE)
+        self.stream_flush_size = getattr(
+            settings, 'COMPRESSION_STREAM_FLUSH_SIZE',
+            COMPRESSION_STREAM_FLUSH_SIZE)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor_class = choose_compressor(request)
+        if (compressor_class is None
+                or response.has_header('Content-Encoding')
+                or not COMPRESSIBLE_TYPES.match(
+                    response.get('Content-Type', ''))):
+            return response
+        if response.streaming:
+            live = response['Content-Type'].startswith(LIVE_STREAM_TYPES)
+            response.streaming_content = self.compress_stream(
+                compressor_class(), response.streaming_content, request.path,
+                flush_size=0 if live else self.stream_flush_size)
+            del response['Content-Length']
+        elif not self.compress_content(
+                compressor_class(), response, request.path):
+            return response
+        weaken_etag(response)
+        response['Content-Encoding'] = compressor_class.encoding
+        return response
+
+    def compress_content(self, compressor, response, path):
+        if len(response.content) < self.min_size:
+            return False
+        started = time.monotonic()
+        content = compressor.compress(response.content) + compressor.finish()
+        elapsed = time.monotonic() - started
+        if len(content) >= len(response.content):
+            return False
+        ratio = len(content) / len(response.content)
+        self.report(path, compressor.encoding, ratio, elapsed)
+        response['Server-Timing'] = SERVER_TIMING.format(
+            elapsed * 1000, compressor.encoding, ratio)
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        return True
+
+    def compress_stream(self, compressor, chunks, path, flush_size):
+        original = compressed = pending = 0
+        elapsed = 0.0
+        for chunk in chunks:
+            started = time.monotonic()
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if pending >= flush_size:
+                data += compressor.flush()
+                pending = 0
+            elapsed += time.monotonic() - started
+            original += len(chunk)
+            compressed += len(data)
+            if data:
+                yield data
+        data = compressor.finish()
+        compressed += len(data)
+        ratio = compressed / original if original else 1
+        self.report(path, compressor.encoding, ratio, elapsed)
+        yield data
+
+    @staticmethod
+    def report(path, encoding, ratio, elapsed):
+        logger.debug(
+            '%s: %s ratio %.2f in %.2f ms',
+            path, encoding, ratio, elapsed * 1000)
+
+
+def weaken_etag(response):
+    # Сжатый ответ не совпадает побайтно с исходным,
+    # поэтому сильный ETag становится слабым.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+
+
+class ReplicaPinMiddleware:
+    """Закрепляет клиента за основной БД после его записи.
+
+    Реплики отстают, поэтому после POST с записью в БД ставим
+    короткую куку, и пока она жива, роутер не читает с реплик.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start_request(pinned=PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            written = routers.finish_request()
+        if written and request.method == 'POST':
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=PIN_SECONDS, httponly=True)
+        return response
@@ -0,0 +1,120 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+OBJECT_TIMEOUT: int = 60 * 60
+# Отсутствие объекта помним недолго: его могут вот-вот создать.
+MISSING_TIMEOUT: int = 60
+MISSING = 'objects:missing'
+
+
+class ObjectCache:
+    """Cache-aside для строк модели по первичному ключу.
+
+    Объект хранится под ключом pk, а уникальные поля из lookups
+    ссылаются на pk: при переименовании устаревшая ссылка просто
+    не сходится с полем объекта. Несуществующие значения тоже
+    кэшируются, чтобы перебор адресов не доходил до базы.
+    Связанные объекты из related достаются из их собственных кэшей.
+    """
+
+    def __init__(self, queryset, lookups=(), related=None,
+                 timeout=OBJECT_TIMEOUT):
+        self.queryset = queryset
+        self.model = queryset.model
+        self.lookups = lookups
+        self.related = related or {}
+        self.timeout = timeout
+        self.prefix = 'objects:{}'.format(self.model._meta.label_lower)
+        post_save.connect(self.changed, sender=self.model, weak=False)
+        post_delete.connect(self.changed, sender=self.model, weak=False)
+
+    def key(self, field, value):
+        if field != 'pk':
+            # Слаги и имена бывают любыми, а ключ кэша — только ASCII.
+            value = hashlib.md5(str(value).encode()).hexdigest()
+        return '{}:{}:{}'.format(self.prefix, field, value)
+
+    def get_many(self, pks):
+        """Словарь pk -> объект; отсутствующих в словаре нет."""
+        pks = {int(pk) for pk in pks}
+        keys = {self.key('pk', pk): pk for pk in pks}
+        found = cache.get_many(keys)
+        objects = {
+            keys[key]: obj for key, obj in found.items() if obj != MISSING}
+        missed = [keys[key] for key in keys if key not in found]
+        if missed:
+            loaded = self.queryset.in_bulk(missed)
+            cache.set_many({
+                self.key('pk', pk): obj for pk, obj in loaded.items()
+            }, self.timeout)
+            cache.set_many({
+                self.key('pk', pk): MISSING
+                for pk in missed if pk not in loaded
+            }, MISSING_TIMEOUT)
+            objects.update(loaded)
+        self.attach_related(objects.values())
+        return objects
+
+    def get(self, pk):
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return None
+        return self.get_many([pk]).get(pk)
+
+    def get_by(self, field, value):
+        """Объект по уникальному полю из lookups или None."""
+        key = self.key(field, value)
+        pk = cache.get(key)
+        if pk == MISSING:
+            return None
+        if pk is not None:
+            obj = self.get(pk)
+            if obj is not None and getattr(obj, field) == value:
+                return obj
+        obj = self.queryset.filter(**{field: value}).first()
+        if obj is None:
+            cache.set(key, MISSING, MISSING_TIMEOUT)
+            return None
+        cache.set_many({
+            key: obj.pk,
+            self.key('pk', obj.pk): obj,
+        }, self.timeout)
+        self.attach_related([obj])
+        return obj
+
+    def get_or_404(self, pk=None, **lookup):
+        if lookup:
+            (field, value), = lookup.items()
+            obj = self.get_by(field, value)
+        else:
+            obj = self.get(pk)
+        if obj is None:
+            raise Http404('No %s matches the given query.'
+                          % self.model._meta.object_name)
+        return obj
+
+    def attach_related(self, objects):
+        for name, related in self.related.items():
+            field = self.model._meta.get_field(name)
+            related_objects = related.get_many({
+                getattr(obj, field.attname) for obj in objects
+            } - {None})
+            for obj in objects:
+                value = related_objects.get(getattr(obj, field.attname))
+                if value is not None:
+                    setattr(obj, name, value)
+
+    def forget(self, pks):
+        """Сбрасывает объекты, изменённые в обход сигналов (update())."""
+        cache.delete_many([self.key('pk', pk) for pk in pks])
+
+    def changed(self, sender, instance, **kwargs):
+        # Удаляем и отрицательные ссылки на новые значения полей.
+        cache.delete_many([self.key('pk', instance.pk)] + [
+            self.key(field, getattr(instance, field))
+            for field in self.lookups
+        ])
@@ -0,0 +1,68 @@
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+# Дальше этого строки не пересчитываем: хватит и фильтров с поиском.
+COUNT_LIMIT: int = 10000
+
+
+def estimated_rows(queryset):
+    """Оценка числа строк таблицы без её полного просмотра.
+
+    PostgreSQL берёт её из статистики, прочие базы — из наибольшего
+    первичного ключа (оценка сверху: удалённые строки не вычитаются).
+    Годится только для выборки без условий, для отфильтрованной
+    возвращает None.
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.model._default_manager.using(
+            queryset.db).aggregate(last=Max('pk'))['last']
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE relname = %s',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Пагинатор без полного COUNT(*) по большой таблице.
+
+    Считает не дальше COUNT_LIMIT строк. Если строк больше, count —
+    оценка таблицы без фильтров или просто COUNT_LIMIT + 1, а
+    approximate становится True. Страницы за оценкой тогда
+    не отбрасываются: есть ли такая страница, решает сама выборка.
+    """
+    approximate = False
+
+    @cached_property
+    def count(self):
+        count = self.object_list.order_by().values(
+            'pk')[:COUNT_LIMIT + 1].count()
+        if count <= COUNT_LIMIT:
+            return count
+        self.approximate = True
+        return max(estimated_rows(self.object_list) or 0, count)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.approximate or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if number <= self.num_pages:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        object_list = self.object_list[bottom:bottom + self.per_page]
+        if not object_list:
+            raise EmptyPage('That page contains no results')
+        return self._get_page(object_list, number, self)
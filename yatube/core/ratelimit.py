@@ -0,0 +1,85 @@
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+# Сколько «окон» ведра живёт ключ в кэше.
+KEY_LIFETIME: int = 10
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 6000): ёмкость ведра и мс на один жетон."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period] * 1000 // int(count)
+
+
+def take_token(key, rate):
+    """Берёт жетон из ведра. Возвращает 0 или сколько секунд ждать.
+
+    Ведро хранится как теоретическое время прибытия (GCRA): каждый
+    запрос атомарно сдвигает его incr'ом на стоимость жетона, а
+    отказ возвращает сдвиг обратно decr'ом.
+    """
+    capacity, interval = parse_rate(rate)
+    now = int(time.time() * 1000)
+    timeout = math.ceil(capacity * interval * KEY_LIFETIME / 1000)
+    cache.add(key, now, timeout)
+    try:
+        arrival = cache.incr(key, interval)
+    except ValueError:
+        # Ключ вытеснили между add и incr.
+        cache.set(key, now + interval, timeout)
+        return 0
+    if arrival < now + interval:
+        # Ведро простаивало и успело наполниться.
+        cache.set(key, now + interval, timeout)
+        return 0
+    excess = arrival - now - capacity * interval
+    if excess <= 0:
+        return 0
+    cache.decr(key, interval)
+    return math.ceil(excess / 1000)
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def ratelimit(name, user=None, ip=None, methods=('POST',)):
+    """Ограничивает частоту запросов к представлению.
+
+    user и ip — скорости вида '10/m' для пользователя и для адреса.
+    Проверка идёт до разбора формы и запросов к БД: id пользователя
+    берётся прямо из сессии. При превышении отдаётся 429 с Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (not getattr(settings, 'RATELIMIT_ENABLED', True)
+                    or request.method not in methods):
+                return view(request, *args, **kwargs)
+            buckets = []
+            user_id = request.session.get(SESSION_KEY)
+            if user and user_id is not None:
+                buckets.append((f'user:{user_id}', user))
+            if ip:
+                buckets.append((f'ip:{client_ip(request)}', ip))
+            for ident, rate in buckets:
+                retry_after = take_token(
+                    f'core:ratelimit:{name}:{ident}', rate)
+                if retry_after:
+                    response = HttpResponse(
+                        'Слишком много запросов, попробуйте позже.',
+                        content_type='text/plain; charset=utf-8',
+                        status=429,
+                    )
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,121 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+_state = threading.local()
+
+AUX_DB = 'aux'
+# Частые мелкие записи, не связанные с контентом внешними ключами.
+AUX_APPS = {'sessions', 'thumbnail', 'django_cache'}
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def start_request(pinned=False):
+    """Готовит состояние роутера к новому запросу."""
+    _state.pinned = pinned
+    _state.written = False
+    _state.replica_reads = False
+
+
+def finish_request():
+    """Возвращает True, если за запрос что-то записали в основную БД."""
+    written = getattr(_state, 'written', False)
+    start_request()
+    return written
+
+
+def is_pinned():
+    """Читает ли текущий запрос только из основной БД."""
+    return getattr(_state, 'pinned', False)
+
+
+@contextmanager
+def read_primary():
+    """Временно запрещает чтение с реплик."""
+    pinned = is_pinned()
+    _state.pinned = True
+    try:
+        yield
+    finally:
+        _state.pinned = pinned
+
+
+def use_replica(view):
+    """Разрешает представлению читать с реплик."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        _state.replica_reads = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _state.replica_reads = False
+    return wrapper
+
+
+class ReplicaRouter:
+    """Пишет в основную БД, чтение лент отдаёт репликам.
+
+    Пока клиент недавно что-то записал, или в текущем запросе уже
+    была запись, читаем из основной БД, чтобы он увидел свои правки.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (replicas()
+                and getattr(_state, 'replica_reads', False)
+                and not getattr(_state, 'pinned', False)
+                and not getattr(_state, 'written', False)):
+            return random.choice(replicas())
+        return None
+
+    def db_for_write(self, model, **hints):
+        _state.written = True
+        # Явно: иначе объект, прочитанный с реплики, сохранился бы туда же.
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными при репликации.
+        if db in replicas():
+            return False
+        return None
+
+
+class AuxRouter:
+    """Уносит сессии, KV-хранилище миниатюр и кэш в отдельную БД.
+
+    В SQLite запись блокирует всю базу, поэтому частые сохранения
+    сессий не должны ждать вместе с записью постов и комментариев.
+    Работает, только если в DATABASES есть база AUX_DB.
+    """
+
+    def _route(self, model):
+        if (AUX_DB in settings.DATABASES
+                and model._meta.app_label in AUX_APPS):
+            return AUX_DB
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._route(model)
+
+    def db_for_write(self, model, **hints):
+        return self._route(model)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if AUX_DB not in settings.DATABASES:
+            return None
+        if app_label in AUX_APPS:
+            return db == AUX_DB
+        if db == AUX_DB:
+            return False
+        return None
@@ -0,0 +1,110 @@
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.functional import cached_property
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico'
+)
+# Файлы меньше этого размера не сжимаем: выигрыша почти нет.
+MIN_COMPRESS_SIZE: int = 256
+
+
+def compressors():
+    """Доступные способы сжатия: (Content-Encoding, суффикс, функция)."""
+    if brotli is not None:
+        yield 'br', '.br', brotli.compress
+    yield 'gzip', '.gz', compress_string
+
+
+def parse_accept_encoding(header):
+    """Пары (кодировка, q) из заголовка Accept-Encoding."""
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        yield coding, quality
+
+
+def acceptable_encodings(header, available):
+    """Кодировки из available, которые клиент принимает, от лучшей.
+
+    q=0 — явный отказ, в том числе через *;q=0. При равном q
+    сохраняется порядок available: он отражает выбор сервера.
+    """
+    qualities = dict(parse_accept_encoding(header))
+    default = qualities.get('*', 0.0)
+    accepted = [
+        (qualities.get(coding, default), coding) for coding in available]
+    return [
+        coding for quality, coding in sorted(
+            accepted, key=lambda item: -item[0])
+        if quality > 0
+    ]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и сжатыми копиями.
+
+    При collectstatic рядом с каждым текстовым файлом кладутся
+    файлы .br и .gz, чтобы не сжимать их на каждый запрос.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = set()
+        for name, hashed_name, done in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(done, Exception):
+                processed.update((name, hashed_name))
+            yield name, hashed_name, done
+        if not dry_run:
+            for name in sorted(processed):
+                self.compress(name)
+            self.__dict__.pop('immutable_names', None)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as source:
+            content = source.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for _, suffix, compress in compressors():
+            compressed = compress(content)
+            if len(compressed) >= len(content):
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+    def stored_name(self, name):
+        # Без collectstatic (разработка, тесты) манифеста нет —
+        # отдаём файл под исходным именем.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    @cached_property
+    def immutable_names(self):
+        """Имена с хэшем: содержимое по ним никогда не меняется."""
+        return frozenset(self.hashed_files.values())
+
+    def is_immutable(self, name):
+        return posixpath.normpath(name) in self.immutable_names
@@ -0,0 +1,20 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..composition import PLACEHOLDER, render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, template_name, **kwargs):
+    """Подключает шаблон, который отрисовывается отдельно для каждого
+    запроса, даже если сама страница взята из кэша."""
+    return render_hole(context.get('request'), template_name, kwargs)
+
+
+@register.simple_tag
+def placeholder(name, key):
+    """Метка, которую заменит фрагмент, отрисованный для всей страницы
+    разом функцией, зарегистрированной через placeholder_renderer."""
+    return mark_safe(PLACEHOLDER.format(name, key))
@@ -0,0 +1,65 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from core import coalescing
+from core.coalescing import LOCK_KEY, single_flight
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.renders = 0
+
+    def render(self, key, results):
+        with single_flight(key) as value:
+            if value is None:
+                self.renders += 1
+                time.sleep(0.1)
+                value = 'страница'
+                cache.set(key, value)
+        results.append(value)
+
+    def test_threads_wait_for_first_render(self):
+        """Потоки воркера ждут первую отрисовку, а не повторяют её."""
+        results = []
+        threads = [
+            threading.Thread(target=self.render, args=('page', results))
+            for _ in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(results, ['страница'] * 10)
+        self.assertEqual(coalescing._inflight, {})
+        self.assertIsNone(cache.get(LOCK_KEY.format('page')))
+
+    def test_waits_for_other_worker(self):
+        """Лок в кэше держит другой воркер: ждём его результат."""
+        cache.add(LOCK_KEY.format('page'), 1)
+        timer = threading.Timer(0.1, cache.set, ('page', 'чужая'))
+        timer.start()
+        results = []
+        self.render('page', results)
+        timer.join()
+        self.assertEqual(self.renders, 0)
+        self.assertEqual(results, ['чужая'])
+
+    @mock.patch.object(coalescing, 'WAIT_TIMEOUT', 0.2)
+    def test_renders_after_timeout(self):
+        cache.add(LOCK_KEY.format('page'), 1)
+        results = []
+        self.render('page', results)
+        self.assertEqual(self.renders, 1)
+
+    def test_lock_released_on_error(self):
+        with self.assertRaises(ValueError):
+            with single_flight('page'):
+                raise ValueError
+        self.assertIsNone(cache.get(LOCK_KEY.format('page')))
+        self.assertEqual(coalescing._inflight, {})
@@ -0,0 +1,45 @@
+from django.test import SimpleTestCase
+
+from core.markup import render
+
+
+class MarkupTest(SimpleTestCase):
+    def test_html_is_escaped(self):
+        self.assertEqual(
+            render('<script>alert(1)</script> **<b>**'),
+            '<p>&lt;script&gt;alert(1)&lt;/script&gt; '
+            '<strong>&lt;b&gt;</strong></p>',
+        )
+
+    def test_inline(self):
+        self.assertEqual(
+            render('**жирный**, *курсив*, snake_case и `a*b*c`'),
+            '<p><strong>жирный</strong>, <em>курсив</em>, snake_case '
+            'и <code>a*b*c</code></p>',
+        )
+
+    def test_links(self):
+        """Ссылки только на http(s), голые адреса тоже становятся ссылками."""
+        self.assertEqual(
+            render('См. https://example.com/?a=1&b=2. [тут](http://x.ru)'),
+            '<p>См. <a href="https://example.com/?a=1&amp;b=2" '
+            'rel="nofollow noopener">https://example.com/?a=1&amp;b=2</a>. '
+            '<a href="http://x.ru" rel="nofollow noopener">тут</a></p>',
+        )
+        self.assertEqual(
+            render('[x](javascript:alert(1))'),
+            '<p>[x](javascript:alert(1))</p>',
+        )
+
+    def test_blocks(self):
+        text = (
+            'строка\nещё строка\n\n- раз\n- два\n\n> цитата\n'
+            '```\n<i>код</i>\n```\n1. первый'
+        )
+        self.assertEqual(render(text), '\n'.join([
+            '<p>строка<br>\nещё строка</p>',
+            '<ul><li>раз</li><li>два</li></ul>',
+            '<blockquote><p>цитата</p></blockquote>',
+            '<pre><code>&lt;i&gt;код&lt;/i&gt;</code></pre>',
+            '<ol><li>первый</li></ol>',
+        ]))
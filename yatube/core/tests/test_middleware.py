@@ -0,0 +1,76 @@
+import gzip
+
+import brotli
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from ..middleware import CompressionMiddleware
+
+CONTENT = 'Длинный текст поста. ' * 100
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip, deflate, br'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_compress_content(self):
+        """Ответ сжимается в br или gzip, ETag становится слабым."""
+        decompress = {'gzip, deflate, br': brotli.decompress,
+                      'gzip': gzip.decompress,
+                      'gzip, br;q=0': gzip.decompress,
+                      'br;q=0.2, gzip;q=0.8': gzip.decompress}
+        for accept, function in decompress.items():
+            with self.subTest(accept=accept):
+                response = HttpResponse(CONTENT)
+                response['ETag'] = '"abc"'
+                response = self.process(response, accept)
+                self.assertEqual(
+                    function(response.content).decode(), CONTENT)
+                self.assertEqual(response['ETag'], 'W/"abc"')
+                self.assertIn('compress;dur=', response['Server-Timing'])
+
+    def test_skip_small_and_encoded(self):
+        """Маленькие и уже сжатые ответы не трогаем."""
+        response = self.process(HttpResponse('коротко'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = HttpResponse(b'x' * 1000, content_type='image/png')
+        self.assertFalse(
+            self.process(response).has_header('Content-Encoding'))
+        response = HttpResponse(CONTENT)
+        response['Content-Encoding'] = 'gzip'
+        self.assertEqual(self.process(response).content, CONTENT.encode())
+        for accept in ('', 'br;q=0, gzip;q=0', 'identity, *;q=0'):
+            with self.subTest(accept=accept):
+                response = self.process(HttpResponse(CONTENT), accept)
+                self.assertEqual(response.content, CONTENT.encode())
+
+    def test_compress_stream_by_chunks(self):
+        """Потоковый ответ сжимается по кусочкам."""
+        chunks = [CONTENT.encode()] * 10
+        response = self.process(StreamingHttpResponse(iter(chunks)), 'gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        compressed = list(response.streaming_content)
+        self.assertGreater(len(compressed), 1)
+        self.assertEqual(
+            gzip.decompress(b''.join(compressed)), b''.join(chunks))
+
+    @override_settings(COMPRESSION_STREAM_FLUSH_SIZE=1000)
+    def test_stream_flushes_by_size(self):
+        """Мелкие куски копятся до порога, события отдаются сразу."""
+        chunks = [b'row,%d\n' % number for number in range(300)]
+        response = self.process(
+            StreamingHttpResponse(iter(chunks), content_type='text/csv'))
+        compressed = [data for data in response.streaming_content if data]
+        self.assertLessEqual(
+            len(compressed), len(b''.join(chunks)) // 1000 + 2)
+        self.assertEqual(
+            brotli.decompress(b''.join(compressed)), b''.join(chunks))
+        events = [b'data: %d\n\n' % number for number in range(5)]
+        response = self.process(StreamingHttpResponse(
+            iter(events), content_type='text/event-stream'), 'gzip')
+        compressed = list(response.streaming_content)
+        self.assertEqual(len(compressed), len(events) + 1)
@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post
+
+from ..ratelimit import take_token
+
+User = get_user_model()
+
+
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст поста',
+        )
+        cls.comment_url = reverse(
+            'posts:add_comment', kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_bucket_refills(self):
+        """Ведро пускает burst запросов и наполняется со временем."""
+        with mock.patch('core.ratelimit.time.time', return_value=1000.0):
+            for _ in range(3):
+                self.assertEqual(take_token('bucket', '3/m'), 0)
+            self.assertEqual(take_token('bucket', '3/m'), 20)
+            # Отказ не сдвигает ведро дальше.
+            self.assertEqual(take_token('bucket', '3/m'), 20)
+        with mock.patch('core.ratelimit.time.time', return_value=1020.0):
+            self.assertEqual(take_token('bucket', '3/m'), 0)
+            self.assertEqual(take_token('bucket', '3/m'), 20)
+
+    def test_comment_limited_before_form(self):
+        """Лишний комментарий получает 429 и не попадает в БД."""
+        for number in range(10):
+            self.authorized_client.post(
+                self.comment_url, {'text': f'Комментарий {number}'})
+        response = self.authorized_client.post(
+            self.comment_url, {'text': 'Лишний'})
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(int(response['Retry-After']) > 0)
+        self.assertEqual(Comment.objects.count(), 10)
+
+    def test_limit_per_ip(self):
+        """Регистрация ограничена по адресу клиента."""
+        url = reverse('users:signup')
+        for _ in range(5):
+            self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.2')
+        self.assertEqual(response.status_code, 200)
+
+    def test_unfollow_limited(self):
+        """Отписки расходуют те же жетоны, что и подписки."""
+        User.objects.create_user(username='author')
+        url = reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        for _ in range(30):
+            self.assertEqual(self.authorized_client.get(url).status_code, 302)
+        self.assertEqual(self.authorized_client.get(url).status_code, 429)
+        response = self.authorized_client.post(
+            reverse('posts:unfollow_many'), {'author': 'author'})
+        self.assertEqual(response.status_code, 429)
+
+    def test_get_not_limited(self):
+        """Показ формы не расходует жетоны."""
+        url = reverse('posts:post_create')
+        for _ in range(10):
+            response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, 200)
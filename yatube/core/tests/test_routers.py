@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+from .. import routers
+from ..middleware import PIN_COOKIE
+
+User = get_user_model()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст поста',
+        )
+
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        routers.start_request()
+        self.addCleanup(routers.finish_request)
+
+    def read_db(self):
+        return routers.use_replica(
+            lambda request: self.router.db_for_read(Post))(None)
+
+    def test_feed_reads_go_to_replica(self):
+        """Ленты читают с реплик, остальное — с основной БД."""
+        self.assertIn(self.read_db(), ['replica1', 'replica2'])
+        self.assertIsNone(self.router.db_for_read(Post))
+        self.assertEqual(
+            self.router.db_for_write(Post, instance=self.post), 'default')
+
+    def test_read_your_writes(self):
+        """После записи в запросе и при куке читаем основную БД."""
+        self.router.db_for_write(Post)
+        self.assertIsNone(self.read_db())
+        routers.start_request(pinned=True)
+        self.assertIsNone(self.read_db())
+
+    def test_replicas_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
+
+    def test_post_pins_client(self):
+        """Комментарий ставит куку, закрепляющую клиента за основной БД."""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        response = client.post(
+            reverse('posts:add_comment', kwargs={'post_id': self.post.pk}),
+            {'text': 'Комментарий'},
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class PageCacheReplicaTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.url = reverse(
+            'posts:group_list', kwargs={'slug': cls.group.slug})
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cached_page_read_from_primary(self):
+        """Страницу для общего кэша не читаем с реплик."""
+        reads = []
+        db_for_read = routers.ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            reads.append(db_for_read(router, model, **hints))
+            return reads[-1]
+
+        with mock.patch.object(
+                routers.ReplicaRouter, 'db_for_read', record):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(reads)
+        self.assertEqual(set(reads), {None})
+
+    def test_pinned_client_bypasses_page_cache(self):
+        """Закреплённый клиент видит свежую страницу, а не кэш."""
+        self.client.get(self.url)
+        # Без сигналов: поколение страниц не сбрасывается.
+        Post.objects.bulk_create([Post(
+            author=User.objects.create_user(username='auth_user'),
+            group=self.group,
+            text='Свежий пост',
+        )])
+        self.assertNotContains(self.client.get(self.url), 'Свежий пост')
+        self.client.cookies[PIN_COOKIE] = '1'
+        self.assertContains(self.client.get(self.url), 'Свежий пост')
+
+
+class AuxRouterTest(TestCase):
+    def setUp(self):
+        self.router = routers.AuxRouter()
+
+    def test_off_without_aux_database(self):
+        self.assertIsNone(self.router.db_for_write(Session))
+        self.assertIsNone(self.router.allow_migrate('default', 'sessions'))
+
+    def test_churn_tables_go_to_aux(self):
+        """Сессии живут только в aux, посты — только не в aux."""
+        databases = dict(settings.DATABASES, aux={})
+        with override_settings(DATABASES=databases):
+            self.assertEqual(self.router.db_for_read(Session), 'aux')
+            self.assertEqual(self.router.db_for_write(Session), 'aux')
+            self.assertIsNone(self.router.db_for_write(Post))
+            self.assertTrue(self.router.allow_migrate('aux', 'sessions'))
+            self.assertFalse(
+                self.router.allow_migrate(DEFAULT_DB_ALIAS, 'sessions'))
+            self.assertFalse(self.router.allow_migrate('aux', 'posts'))
+            self.assertIsNone(
+                self.router.allow_migrate(DEFAULT_DB_ALIAS, 'posts'))
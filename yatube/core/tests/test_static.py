@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(STATIC_ROOT=TEMP_STATIC_ROOT)
+class HashedStaticTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.css = staticfiles_storage.stored_name('css/bootstrap.min.css')
+
+    def test_collectstatic_precompresses(self):
+        """collectstatic кладёт рядом с файлами сжатые копии."""
+        self.assertNotEqual(self.css, 'css/bootstrap.min.css')
+        for suffix in ('.gz', '.br'):
+            with self.subTest(suffix=suffix):
+                self.assertTrue(staticfiles_storage.exists(self.css + suffix))
+        self.assertFalse(
+            staticfiles_storage.exists('img/logo.png.gz'))
+
+    def test_serve_compressed_immutable(self):
+        """Отдаётся сжатая копия, файл с хэшем кэшируется навсегда."""
+        url = staticfiles_storage.url('css/bootstrap.min.css')
+        encodings = {
+            'gzip, deflate, br': 'br',
+            'gzip': 'gzip',
+            '': None,
+            'gzip, br;q=0': 'gzip',
+            'br;q=0.5, gzip': 'gzip',
+            '*;q=0': None,
+            '*': 'br',
+        }
+        for accept, encoding in encodings.items():
+            with self.subTest(accept=accept):
+                response = self.client.get(
+                    url, HTTP_ACCEPT_ENCODING=accept)
+                self.assertEqual(response.get('Content-Encoding'), encoding)
+                self.assertEqual(response['Content-Type'], 'text/css')
+                self.assertIn('immutable', response['Cache-Control'])
+                self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_unhashed_name_not_immutable(self):
+        """Файл без хэша в имени не кэшируется надолго."""
+        response = self.client.get('/static/css/bootstrap.min.css')
+        self.assertNotIn('immutable', response['Cache-Control'])
+        response = self.client.get('/static/css/missing.css')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.test import SimpleTestCase
+
+from core import tiered
+from core.tiered import LocalTier, TieredCache
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        cache.tier.stats.clear()
+        self.shared = caches['shared']
+
+    def other_process(self):
+        with mock.patch.dict(tiered._tiers, clear=True):
+            return TieredCache('shared', {})
+
+    def test_local_tier_serves_hot_keys(self):
+        cache.set('objects:post:1', {'text': 'пост'}, 60)
+        self.shared.delete('objects:post:1')
+        self.assertEqual(cache.get('objects:post:1'), {'text': 'пост'})
+        self.assertEqual(cache.stats()['local'], 1)
+
+    def test_returns_copies(self):
+        cache.set('objects:post:1', {'text': 'пост'})
+        cache.get('objects:post:1')['text'] = 'изменён'
+        self.assertEqual(cache.get('objects:post:1'), {'text': 'пост'})
+
+    def test_other_keys_bypass_local_tier(self):
+        cache.set('posts:unread:1', 5)
+        self.assertEqual(cache.tier.entries, {})
+        self.assertEqual(cache.incr('posts:unread:1'), 6)
+
+    def test_delete_reaches_other_processes(self):
+        """Удаление в одном процессе сбрасывает копии в остальных."""
+        other = self.other_process()
+        cache.set('objects:post:1', 'старый')
+        self.assertEqual(other.get('objects:post:1'), 'старый')
+        cache.delete('objects:post:1')
+        cache.set('objects:post:1', 'новый')
+        self.assertEqual(other.get('objects:post:1'), 'старый')
+        other.tier.synced = 0
+        self.assertEqual(other.get('objects:post:1'), 'новый')
+        self.assertEqual(other.stats()['shared'], 2)
+
+    def test_delete_drops_only_its_bucket(self):
+        """Удаление ключа не сбрасывает чужие корзины в других процессах."""
+        other = self.other_process()
+        keys = [f'objects:post:{number}' for number in range(10)]
+        kept = next(
+            key for key in keys
+            if cache._bucket(key) != cache._bucket(keys[0]))
+        cache.set_many({keys[0]: 'удалён', kept: 'остался'})
+        self.assertEqual(other.get_many([keys[0], kept]), {
+            keys[0]: 'удалён', kept: 'остался'})
+        cache.delete(keys[0])
+        self.shared.set(kept, 'в общем кэше')
+        other.tier.synced = 0
+        self.assertIsNone(other.get(keys[0]))
+        self.assertEqual(other.get(kept), 'остался')
+
+    def test_own_delete_keeps_new_value(self):
+        """Своё удаление не сбрасывает значение, записанное после него."""
+        cache.get('objects:post:1')
+        cache.set('objects:post:1', 'старый')
+        cache.delete('objects:post:1')
+        cache.set('objects:post:1', 'новый')
+        self.shared.delete('objects:post:1')
+        cache.tier.synced = 0
+        self.assertEqual(cache.get('objects:post:1'), 'новый')
+        self.assertEqual(cache.stats()['local'], 1)
+
+    def test_ttl_jitter(self):
+        with mock.patch('random.uniform', return_value=tiered.TTL_JITTER):
+            self.assertEqual(cache._timeout(100), 110)
+        self.assertIsNone(cache._timeout(None))
+
+    def test_lru_bounds(self):
+        tier = LocalTier(max_entries=2, max_bytes=10)
+        tier.set('a', b'1', 60)
+        tier.set('b', b'2', 60)
+        tier.get('a')
+        tier.set('c', b'3', 60)
+        self.assertEqual(list(tier.entries), ['a', 'c'])
+        tier.set('d', b'x' * 10, 60)
+        self.assertEqual(list(tier.entries), ['d'])
+        tier.set('e', b'x' * 11, 60)
+        self.assertNotIn('e', tier.entries)
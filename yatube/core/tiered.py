@@ -0,0 +1,298 @@
+import logging
+import pickle
+import random
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+logger = logging.getLogger(__name__)
+
+# Локально держим только часто читаемые ключи, которые меняются
+# удалением или новым ключом: фрагменты, страницы, карточки, объекты.
+LOCAL_PREFIXES = ('template.cache.', 'core:page:', 'posts:card:', 'objects:')
+LOCAL_TIMEOUT: int = 5
+LOCAL_MAX_ENTRIES: int = 1000
+LOCAL_MAX_BYTES: int = 16 * 1024 * 1024
+# Раз в столько секунд сверяем поколения с общим кэшем.
+SYNC_INTERVAL: float = 1
+# Ключи разложены по корзинам по хэшу: удаление ключа сбрасывает
+# в других процессах только его корзину, а не все ключи префикса.
+GENERATION_BUCKETS: int = 64
+# Доля, на которую случайно удлиняется время жизни ключа.
+TTL_JITTER: float = 0.1
+STATS_INTERVAL: int = 60
+GENERATION_KEY = 'core:tiered:generation:{}'
+
+# Локальный уровень общий для всех потоков процесса,
+# как хранилище LocMemCache.
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class LocalTier:
+    """LRU в памяти процесса с ограничением по числу записей и байтам.
+
+    Запись помнит поколение своей корзины на момент сохранения
+    и перестаёт читаться, как только поколение корзины сменилось.
+    """
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.lock = threading.Lock()
+        self.generations = {}
+        self.synced = 0
+        self.logged = time.monotonic()
+        self.stats = Counter()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            data, expires, bucket, generation = entry
+            if (expires <= time.monotonic()
+                    or generation != self.generations.get(bucket)):
+                self._pop(key)
+                return None
+            self.entries.move_to_end(key)
+            return data
+
+    def set(self, key, data, timeout, bucket=None):
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            self._pop(key)
+            self.entries[key] = (
+                data, time.monotonic() + timeout,
+                bucket, self.generations.get(bucket),
+            )
+            self.size += len(data)
+            while (len(self.entries) > self.max_entries
+                   or self.size > self.max_bytes):
+                self._pop(next(iter(self.entries)))
+
+    def delete(self, key):
+        with self.lock:
+            self._pop(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.generations.clear()
+            self.synced = 0
+
+    def _pop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class TieredCache(BaseCache):
+    """Кэш процесса перед общим кэшем из CACHES.
+
+    LOCATION — имя общего кэша. Ключи с префиксами LOCAL_PREFIXES
+    читаются сначала из LRU в памяти процесса. Удаление такого ключа
+    увеличивает в общем кэше поколение его корзины, и остальные
+    процессы перестают читать свои копии ключей этой корзины после
+    ближайшей сверки поколений, не позже чем через SYNC_INTERVAL.
+    Остальные ключи идут прямо в общий кэш.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = location
+        self.local_prefixes = tuple(
+            options.get('LOCAL_PREFIXES', LOCAL_PREFIXES))
+        self.local_timeout = options.get('LOCAL_TIMEOUT', LOCAL_TIMEOUT)
+        self.sync_interval = options.get('SYNC_INTERVAL', SYNC_INTERVAL)
+        self.jitter = options.get('TTL_JITTER', TTL_JITTER)
+        self.buckets = options.get('GENERATION_BUCKETS', GENERATION_BUCKETS)
+        with _tiers_lock:
+            self.tier = _tiers.setdefault(location, LocalTier(
+                options.get('LOCAL_MAX_ENTRIES', LOCAL_MAX_ENTRIES),
+                options.get('LOCAL_MAX_BYTES', LOCAL_MAX_BYTES),
+            ))
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def stats(self):
+        """Попадания по уровням для локальных ключей с начала процесса."""
+        stats = dict(self.tier.stats)
+        total = sum(stats.values())
+        for name in ('local', 'shared'):
+            stats[f'{name}_ratio'] = stats.get(name, 0) / total if total else 0
+        return stats
+
+    def _prefix(self, key):
+        for prefix in self.local_prefixes:
+            if key.startswith(prefix):
+                return prefix
+        return None
+
+    def _bucket(self, key):
+        return zlib.crc32(key.encode()) % self.buckets
+
+    def _timeout(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.shared.default_timeout
+        if timeout:
+            # Ключи, записанные одновременно, истекут вразнобой.
+            timeout = int(timeout * (1 + random.uniform(0, self.jitter)))
+        return timeout
+
+    def _remember(self, key, value, version, timeout=None):
+        if timeout is not None:
+            timeout = min(timeout, self.local_timeout)
+        else:
+            timeout = self.local_timeout
+        if timeout > 0:
+            self.tier.set(
+                self.make_key(key, version),
+                pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                timeout,
+                self._bucket(key),
+            )
+
+    def _sync(self):
+        now = time.monotonic()
+        tier = self.tier
+        if now - tier.synced < self.sync_interval:
+            return
+        tier.synced = now
+        keys = {
+            GENERATION_KEY.format(bucket): bucket
+            for bucket in range(self.buckets)
+        }
+        current = self.shared.get_many(keys)
+        # Записи устаревших корзин отсеются при чтении.
+        with tier.lock:
+            tier.generations = {
+                bucket: current.get(key) for key, bucket in keys.items()}
+        if now - tier.logged >= STATS_INTERVAL:
+            tier.logged = now
+            logger.info('tiered cache %s: %s', self.shared_alias, self.stats())
+
+    def _invalidate(self, buckets):
+        for bucket in buckets:
+            key = GENERATION_KEY.format(bucket)
+            try:
+                generation = self.shared.incr(key)
+            except ValueError:
+                generation = int(time.time() * 1000)
+                self.shared.set(key, generation, None)
+            # Своё поколение знаем сразу: ключ, записанный после
+            # удаления, не сбросится при следующей сверке.
+            with self.tier.lock:
+                self.tier.generations[bucket] = generation
+
+    def _local_get(self, key, version):
+        data = self.tier.get(self.make_key(key, version))
+        if data is None:
+            return None
+        self.tier.stats['local'] += 1
+        return pickle.loads(data)
+
+    def get(self, key, default=None, version=None):
+        if self._prefix(key) is None:
+            return self.shared.get(key, default, version)
+        return self.get_many([key], version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found, rest = {}, []
+        for key in keys:
+            value = None
+            if self._prefix(key) is not None:
+                value = self._local_get(key, version)
+            if value is None:
+                rest.append(key)
+            else:
+                found[key] = value
+        if rest:
+            shared = self.shared.get_many(rest, version)
+            for key in rest:
+                if self._prefix(key) is None:
+                    continue
+                if key in shared:
+                    self.tier.stats['shared'] += 1
+                    self._remember(key, shared[key], version)
+                else:
+                    self.tier.stats['miss'] += 1
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._prefix(key) is None:
+            return self.shared.set(key, value, timeout, version)
+        timeout = self._timeout(timeout)
+        self.shared.set(key, value, timeout, version)
+        self._remember(key, value, version, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        if self._prefix(key) is None:
+            return self.shared.add(key, value, timeout, version)
+        timeout = self._timeout(timeout)
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self._remember(key, value, version, timeout)
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not any(self._prefix(key) for key in data):
+            return self.shared.set_many(data, timeout, version)
+        timeout = self._timeout(timeout)
+        failed = self.shared.set_many(data, timeout, version)
+        for key, value in data.items():
+            if self._prefix(key) is not None and key not in failed:
+                self._remember(key, value, version, timeout)
+        return failed
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version)
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version)
+        buckets = set()
+        for key in keys:
+            if self._prefix(key) is not None:
+                self.tier.delete(self.make_key(key, version))
+                buckets.add(self._bucket(key))
+        self._invalidate(buckets)
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version)
+        if self._prefix(key) is not None:
+            self.tier.delete(self.make_key(key, version))
+            self._invalidate([self._bucket(key)])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version)
+
+    def has_key(self, key, version=None):
+        if self._prefix(key) is not None:
+            if self.tier.get(self.make_key(key, version)) is not None:
+                return True
+        return self.shared.has_key(key, version)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, self._timeout(timeout), version)
+
+    def clear(self):
+        self.shared.clear()
+        self.tier.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -1,5 +1,16 @@
 # core/views.py
+import mimetypes
+import posixpath
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404
 from django.shortcuts import render
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .storage import acceptable_encodings, compressors
+
+# Год: столько браузер может хранить файл с хэшем в имени.
+STATIC_MAX_AGE: int = 60 * 60 * 24 * 365
 
 
 def page_not_found(request, exception):
@@ -23,3 +34,36 @@ def csrf_failure(request, reason=''):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+def serve_static(request, path):
+    """Отдаёт статику, выбирая сжатую копию по Accept-Encoding.
+
+    Файлы с хэшем в имени кэшируются браузером навсегда.
+    """
+    name = posixpath.normpath(path).lstrip('/')
+    if not staticfiles_storage.exists(name):
+        raise Http404
+    suffixes = {coding: suffix for coding, suffix, _ in compressors()}
+    served, encoding = name, None
+    for candidate in acceptable_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), suffixes):
+        if staticfiles_storage.exists(name + suffixes[candidate]):
+            served, encoding = name + suffixes[candidate], candidate
+            break
+    try:
+        file = staticfiles_storage.open(served)
+    except OSError:
+        raise Http404
+    content_type = mimetypes.guess_type(name)[0]
+    response = FileResponse(
+        file, content_type=content_type or 'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if staticfiles_storage.is_immutable(name):
+        patch_cache_control(
+            response, public=True, max_age=STATIC_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=0)
+    return response
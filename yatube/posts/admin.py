@@ -1,17 +1,152 @@
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.urls import path
+
+from core.export import FORMATS, stream_export
+from core.paginator import EstimatedCountPaginator
 
 from .models import Post, Group, Comment, Follow
 
 
-class PostAdmin(admin.ModelAdmin):
+class FastChangeListMixin:
+    """Список без полного подсчёта строк таблицы."""
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class ExportMixin:
+    """Потоковая выгрузка списка в CSV и JSON Lines.
+
+    Выгружает выбранные строки действием или весь отфильтрованный
+    список кнопкой над ним. Связанные поля указываются через __.
+    """
+    export_fields = ()
+    change_list_template = 'admin/export_change_list.html'
+    actions = ('export_csv', 'export_jsonl')
+
+    def export(self, queryset, format):
+        return stream_export(
+            queryset, self.export_fields, format,
+            self.model._meta.model_name)
+
+    def export_csv(self, request, queryset):
+        return self.export(queryset, 'csv')
+    export_csv.short_description = 'Выгрузить в CSV'
+
+    def export_jsonl(self, request, queryset):
+        return self.export(queryset, 'jsonl')
+    export_jsonl.short_description = 'Выгрузить в JSON Lines'
+
+    def export_view(self, request, format):
+        if format not in FORMATS:
+            raise Http404
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        changelist = self.get_changelist_instance(request)
+        return self.export(changelist.queryset, format)
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                'export/<str:format>/',
+                self.admin_site.admin_view(self.export_view),
+                name='%s_%s_export' % info,
+            ),
+        ] + super().get_urls()
+
+
+class SelectedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которому выбранный объект передают заранее.
+
+    Обычный виджет запрашивает подпись выбранного значения сам,
+    и в редактируемом списке это запрос на каждую строку.
+    """
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        values = [
+            str(item) for item in value
+            if str(item) not in self.choices.field.empty_values
+        ]
+        expected = [] if self.selected is None else [str(self.selected.pk)]
+        if values != expected:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        if self.selected is not None:
+            options.append(self.create_option(
+                name,
+                self.selected.pk,
+                self.choices.field.label_from_instance(self.selected),
+                True,
+                len(options),
+            ))
+        return [(None, options, 0)]
+
+
+class PostAdmin(ExportMixin, FastChangeListMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group',)
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    # Вместо выпадающих списков всех групп и всех пользователей.
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    export_fields = (
+        'id', 'pub_date', 'author__username', 'group__slug', 'text',
+        'is_published',
+    )
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_fields:
+            kwargs['widget'] = SelectedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        base = super().get_changelist_form(request, **kwargs)
+
+        class ChangeListForm(base):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                # Группа строки уже загружена через list_select_related.
+                for name, field in self.fields.items():
+                    widget = getattr(field.widget, 'widget', field.widget)
+                    if isinstance(widget, SelectedAutocompleteSelect):
+                        widget.selected = getattr(self.instance, name)
+
+        return ChangeListForm
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('title', 'slug')
+    search_fields = ('title', 'slug')
+
+
+class CommentAdmin(ExportMixin, FastChangeListMixin, admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
+    search_fields = ('text',)
+    date_hierarchy = 'created'
+    export_fields = ('id', 'created', 'post_id', 'author__username', 'text')
+
+
+class FollowAdmin(ExportMixin, FastChangeListMixin, admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    export_fields = ('id', 'user__username', 'author__username')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
-admin.site.register(Comment)
-admin.site.register(Follow)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
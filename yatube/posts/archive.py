@@ -0,0 +1,114 @@
+from collections import Counter
+
+from django.db import transaction
+
+from core.composition import invalidate_pages
+from . import cached, stats
+from .batch import batch
+from .likes import likes_counts
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+ARCHIVE_BATCH_SIZE: int = 500
+
+
+def archive_batch(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Переносит в архив самые старые посты раньше before с комментариями.
+
+    В архив попадают только пост и комментарии. Лайки сводятся
+    в likes_count, а строки лайков, рейтинга, ревизий, тегов
+    и упоминаний удаляются каскадом вместе с постом: архивный пост
+    только читают, в «Популярном», истории правок, лентах тегов
+    и упоминаниях его нет. Одна пачка — одна короткая транзакция.
+    Сводка групп меняется по разу на группу и автора, кэш страниц
+    сбрасывается один раз на пачку. Возвращает число постов.
+    """
+    with transaction.atomic():
+        posts = list(Post.objects.published().filter(
+            pub_date__lt=before).order_by('pub_date')[:batch_size])
+        if not posts:
+            return 0
+        ids = [post.pk for post in posts]
+        likes = likes_counts(ids)
+        ArchivedPost.objects.bulk_create([
+            ArchivedPost(
+                id=post.pk,
+                text=post.text,
+                text_html=post.text_html,
+                renderer_version=post.renderer_version,
+                pub_date=post.pub_date,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+                version=post.version,
+                likes_count=likes.get(post.pk, post.likes_count),
+            )
+            for post in posts
+        ])
+        ArchivedComment.objects.bulk_create([
+            ArchivedComment(
+                id=comment.pk,
+                post_id=comment.post_id,
+                author_id=comment.author_id,
+                text=comment.text,
+                created=comment.created,
+            )
+            for comment in Comment.objects.filter(post_id__in=ids)
+        ])
+        with batch():
+            Post.objects.filter(pk__in=ids).delete()
+        removed = Counter(
+            (post.group_id, post.author_id)
+            for post in posts if post.group_id is not None)
+        for (group_id, author_id), count in removed.items():
+            stats.change_group_stats(group_id, author_id, -count)
+    invalidate_pages()
+    # Сигналы сбросили кэш объектов ещё в транзакции: до коммита
+    # его могли заполнить старыми строками.
+    cached.posts.forget(ids)
+    return len(posts)
+
+
+def archive_posts(before, batch_size=ARCHIVE_BATCH_SIZE):
+    """Архивирует пачками, отдавая размер каждой пачки."""
+    while True:
+        moved = archive_batch(before, batch_size)
+        if not moved:
+            return
+        yield moved
+
+
+class ChainedPosts:
+    """Посты автора: сначала горячие, за ними архивные.
+
+    Архивируются всегда самые старые посты, поэтому порядок по дате
+    сохраняется. Paginator нужны только count() и срезы.
+    """
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._counts = None
+
+    def counts(self):
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return self._counts
+
+    def count(self):
+        return sum(self.counts())
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        result = []
+        for queryset, count in zip(self.querysets, self.counts()):
+            if stop is not None and stop <= 0:
+                break
+            if start < count:
+                result.extend(queryset[start:stop])
+            start = max(start - count, 0)
+            stop = None if stop is None else stop - count
+        return result
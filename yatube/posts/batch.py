@@ -0,0 +1,24 @@
+import threading
+from contextlib import contextmanager
+
+_state = threading.local()
+
+
+def in_batch():
+    """Идёт ли сейчас пакетная запись в этом потоке."""
+    return getattr(_state, 'active', False)
+
+
+@contextmanager
+def batch():
+    """Пакетная запись: сигналы не рассылают изменения поштучно.
+
+    Кэш страниц, ленты и сводку групп тот, кто ведёт пачку,
+    обновляет сам, один раз на всю пачку.
+    """
+    active = in_batch()
+    _state.active = True
+    try:
+        yield
+    finally:
+        _state.active = active
@@ -0,0 +1,9 @@
+from core.objects import ObjectCache
+from .models import Group, Post, User
+
+# Хэш пароля в общем кэше ни к чему: представлениям он не нужен.
+users = ObjectCache(User.objects.defer('password'), lookups=('username',))
+groups = ObjectCache(Group.objects.all(), lookups=('slug',))
+# Черновики тоже здесь: представления сами проверяют is_published.
+posts = ObjectCache(
+    Post.objects.all(), related={'author': users, 'group': groups})
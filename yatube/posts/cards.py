@@ -0,0 +1,37 @@
+from django.core.cache import cache
+from django.template.loader import render_to_string
+
+CARD_TEMPLATE = 'posts/includes/post_list.html'
+CARD_TIMEOUT: int = 60 * 60 * 24
+
+
+def card_key(post, show_author_link, show_group_link):
+    """Ключ карточки: id поста, версии правки и HTML, вариант отрисовки."""
+    return 'posts:card:{}:{}:{}:{}{}'.format(
+        post.pk, post.version, post.renderer_version,
+        int(show_author_link), int(show_group_link)
+    )
+
+
+def render_cards(posts, show_author_link=True, show_group_link=True):
+    """Возвращает HTML карточек постов страницы.
+
+    Все карточки запрашиваются из кэша одним get_many,
+    отрисовываются и сохраняются только промахи.
+    """
+    keys = [
+        card_key(post, show_author_link, show_group_link) for post in posts
+    ]
+    cards = cache.get_many(keys)
+    missing = {}
+    for key, post in zip(keys, posts):
+        if key not in cards:
+            missing[key] = render_to_string(CARD_TEMPLATE, {
+                'post': post,
+                'show_author_link': show_author_link,
+                'show_group_link': show_group_link,
+            })
+    if missing:
+        cache.set_many(missing, CARD_TIMEOUT)
+        cards.update(missing)
+    return [cards[key] for key in keys]
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from core.composition import invalidate_pages, placeholder_renderer
+from . import graph, unread
+from .models import Follow, User
+
+
+def followed_author_ids(user, author_ids):
+    """На кого из авторов подписан пользователь — одним запросом."""
+    if not user.is_authenticated:
+        return set()
+    return set(Follow.objects.filter(
+        user=user, author_id__in=author_ids,
+    ).values_list('author_id', flat=True))
+
+
+def bulk_follow(user, usernames):
+    """Подписывает на нескольких авторов в одной транзакции.
+
+    Возвращает количество новых подписок.
+    """
+    with transaction.atomic():
+        author_ids = set(User.objects.filter(
+            username__in=usernames,
+        ).exclude(pk=user.pk).values_list('pk', flat=True))
+        new = author_ids - followed_author_ids(user, author_ids)
+        # bulk_create не шлёт post_save, поэтому граф и кэш
+        # страниц обновляем сами.
+        Follow.objects.bulk_create(
+            [Follow(user=user, author_id=author_id) for author_id in new],
+            ignore_conflicts=True,
+        )
+    for author_id in new:
+        graph.follow_added(user.pk, author_id)
+    if new:
+        unread.forget(user.pk)
+        invalidate_pages()
+    return len(new)
+
+
+def bulk_unfollow(user, usernames):
+    """Отписывает от нескольких авторов в одной транзакции."""
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(
+            user=user, author__username__in=usernames).delete()
+    return deleted
+
+
+@placeholder_renderer('follow')
+def render_follow_buttons(request, keys):
+    if not request.user.is_authenticated:
+        return {}
+    author_ids = [int(key) for key in keys if int(key) != request.user.pk]
+    usernames = dict(User.objects.filter(
+        pk__in=author_ids).values_list('pk', 'username'))
+    followed = followed_author_ids(request.user, author_ids)
+    return {
+        str(author_id): render_to_string(
+            'posts/includes/card_follow_button.html', {
+                'username': username,
+                'followed': author_id in followed,
+            }, request)
+        for author_id, username in usernames.items()
+    }
@@ -1,4 +1,5 @@
 from django import forms
+from django.utils import timezone
 
 from .models import Post, Comment
 
@@ -14,3 +15,36 @@ class CommentForm(forms.ModelForm):
     class Meta:
         model = Comment
         fields = ('text',)
+
+
+class ScheduleForm(forms.Form):
+    """Черновик или отложенная публикация.
+
+    Отдельно от PostForm: поля публикации не входят в форму поста.
+    """
+    draft = forms.BooleanField(
+        label='Сохранить как черновик',
+        required=False,
+    )
+    publish_at = forms.DateTimeField(
+        label='Опубликовать позже',
+        required=False,
+        help_text='ГГГГ-ММ-ДД ЧЧ:ММ, пусто — опубликовать сразу',
+    )
+
+    def clean_publish_at(self):
+        publish_at = self.cleaned_data['publish_at']
+        if publish_at is not None and publish_at <= timezone.now():
+            raise forms.ValidationError('Это время уже прошло')
+        return publish_at
+
+    def apply(self, post):
+        """Переносит выбор в пост, ещё не сохраняя его."""
+        draft = self.cleaned_data['draft']
+        publish_at = None if draft else self.cleaned_data['publish_at']
+        publish_now = not draft and publish_at is None
+        if publish_now and post.pk is not None and not post.is_published:
+            # Черновик публикуется сейчас, а не в день создания.
+            post.pub_date = timezone.now()
+        post.is_published = publish_now
+        post.publish_at = publish_at
@@ -0,0 +1,233 @@
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+
+from django.core.cache import cache
+
+from .models import Follow
+
+# Не чаще раза в столько секунд процесс сверяет граф с БД.
+REFRESH_INTERVAL: int = 5
+# Граф пересобирается, когда накопленных правок больше этой доли рёбер.
+REBUILD_RATIO: float = 0.1
+# Сколько друзей пользователя смотреть при поиске рекомендаций.
+SUGGESTION_FANOUT: int = 200
+JOURNAL_KEY = 'posts:graph:deleted'
+JOURNAL_TIMEOUT: int = 60 * 60 * 24
+# Если отстали от журнала больше чем на столько записей — пересобираем.
+JOURNAL_MAX_GAP: int = 1000
+
+
+def _csr(pairs, size):
+    """Строит CSR: offsets[v]..offsets[v + 1] — соседи вершины v."""
+    offsets = array('i', bytes(4 * (size + 2)))
+    for source, _ in pairs:
+        offsets[source + 1] += 1
+    for index in range(1, len(offsets)):
+        offsets[index] += offsets[index - 1]
+    targets = array('i', bytes(4 * len(pairs)))
+    position = array('i', offsets)
+    for source, target in sorted(pairs):
+        targets[position[source]] = target
+        position[source] += 1
+    return offsets, targets
+
+
+class FollowGraph:
+    """Граф подписок в массивах CSR с небольшим слоем свежих правок.
+
+    Основа неизменяемая и компактная: два массива на каждое
+    направление. Подписки и отписки после сборки хранятся в
+    словарях added и removed, пока их не станет слишком много.
+    """
+
+    def __init__(self, edges, last_id=0, journal=0):
+        self.size = max((max(edge) for edge in edges), default=0)
+        self.out_offsets, self.out_targets = _csr(edges, self.size)
+        self.in_offsets, self.in_sources = _csr(
+            [(author, user) for user, author in edges], self.size)
+        # {(направление, вершина): множество соседей}
+        self.added = defaultdict(set)
+        self.removed = defaultdict(set)
+        self.overlay = 0
+        self.last_id = last_id
+        self.journal = journal
+
+    def _row(self, direction, vertex):
+        offsets, targets = (
+            (self.out_offsets, self.out_targets) if direction == 'out'
+            else (self.in_offsets, self.in_sources))
+        if vertex > self.size:
+            return targets[0:0]
+        return targets[offsets[vertex]:offsets[vertex + 1]]
+
+    def _in_base(self, user_id, author_id):
+        row = self._row('out', user_id)
+        index = bisect_left(row, author_id)
+        return index < len(row) and row[index] == author_id
+
+    def _change(self, user_id, author_id, include, exclude):
+        for key, value in ((('out', user_id), author_id),
+                           (('in', author_id), user_id)):
+            if value in exclude.get(key, ()):
+                exclude[key].discard(value)
+                self.overlay -= 1
+            elif include is not None:
+                include[key].add(value)
+                self.overlay += 1
+
+    def is_following(self, user_id, author_id):
+        if author_id in self.added.get(('out', user_id), ()):
+            return True
+        return (
+            author_id not in self.removed.get(('out', user_id), ())
+            and self._in_base(user_id, author_id))
+
+    def add_edge(self, user_id, author_id):
+        if self.is_following(user_id, author_id):
+            return
+        in_base = self._in_base(user_id, author_id)
+        self._change(
+            user_id, author_id, None if in_base else self.added,
+            self.removed)
+
+    def remove_edge(self, user_id, author_id):
+        if not self.is_following(user_id, author_id):
+            return
+        in_base = self._in_base(user_id, author_id)
+        self._change(
+            user_id, author_id, self.removed if in_base else None,
+            self.added)
+
+    def _neighbours(self, direction, vertex):
+        result = set(self._row(direction, vertex))
+        result -= self.removed.get((direction, vertex), set())
+        result |= self.added.get((direction, vertex), set())
+        return result
+
+    def _count(self, direction, vertex):
+        return (
+            len(self._row(direction, vertex))
+            - len(self.removed.get((direction, vertex), ()))
+            + len(self.added.get((direction, vertex), ())))
+
+    def following(self, user_id):
+        """Авторы, на которых подписан пользователь."""
+        return self._neighbours('out', user_id)
+
+    def followers(self, author_id):
+        """Подписчики автора."""
+        return self._neighbours('in', author_id)
+
+    def following_count(self, user_id):
+        return self._count('out', user_id)
+
+    def followers_count(self, author_id):
+        return self._count('in', author_id)
+
+    def mutual(self, user_id):
+        """Взаимные подписки."""
+        return self.following(user_id) & self.followers(user_id)
+
+    def suggestions(self, user_id, limit=5):
+        """На кого подписаны те, на кого подписан пользователь."""
+        following = self.following(user_id)
+        counts = Counter()
+        for friend in sorted(following)[:SUGGESTION_FANOUT]:
+            counts.update(self.following(friend))
+        for author in following | {user_id}:
+            counts.pop(author, None)
+        return [author for author, _ in counts.most_common(limit)]
+
+    @property
+    def needs_rebuild(self):
+        return self.overlay > REBUILD_RATIO * len(self.out_targets) + 200
+
+
+def _load():
+    journal = cache.get_or_set(JOURNAL_KEY, 0, None)
+    edges = list(Follow.objects.values_list('user_id', 'author_id'))
+    last_id = Follow.objects.order_by('-pk').values_list(
+        'pk', flat=True).first() or 0
+    return FollowGraph(edges, last_id, journal)
+
+
+def _refresh(graph):
+    """Догоняет граф: новые подписки по id, отписки по журналу."""
+    journal = cache.get(JOURNAL_KEY)
+    if (journal is None or journal < graph.journal
+            or journal - graph.journal > JOURNAL_MAX_GAP):
+        return _load()
+    new = Follow.objects.filter(pk__gt=graph.last_id).values_list(
+        'pk', 'user_id', 'author_id')
+    for pk, user_id, author_id in new:
+        graph.add_edge(user_id, author_id)
+        graph.last_id = max(graph.last_id, pk)
+    if journal > graph.journal:
+        keys = [
+            f'{JOURNAL_KEY}:{number}'
+            for number in range(graph.journal + 1, journal + 1)
+        ]
+        deleted = cache.get_many(keys)
+        if len(deleted) != len(keys):
+            return _load()
+        # Ребро могли удалить и создать заново — сверяемся с БД.
+        users = {user for user, _ in deleted.values()}
+        authors = {author for _, author in deleted.values()}
+        alive = set(Follow.objects.filter(
+            user_id__in=users, author_id__in=authors).values_list(
+            'user_id', 'author_id'))
+        for edge in deleted.values():
+            if edge in alive:
+                graph.add_edge(*edge)
+            else:
+                graph.remove_edge(*edge)
+        graph.journal = journal
+    return _load() if graph.needs_rebuild else graph
+
+
+_lock = threading.Lock()
+_state = {'graph': None, 'checked': 0.0}
+
+
+def get_follow_graph():
+    """Граф подписок процесса, сверенный с БД не раньше REFRESH_INTERVAL."""
+    with _lock:
+        now = time.monotonic()
+        if _state['graph'] is None:
+            _state['graph'] = _load()
+        elif now - _state['checked'] > REFRESH_INTERVAL:
+            _state['graph'] = _refresh(_state['graph'])
+        else:
+            return _state['graph']
+        _state['checked'] = now
+        return _state['graph']
+
+
+def reset_follow_graph():
+    with _lock:
+        _state['graph'] = None
+
+
+def follow_added(user_id, author_id):
+    with _lock:
+        if _state['graph'] is not None:
+            _state['graph'].add_edge(user_id, author_id)
+
+
+def follow_removed(user_id, author_id):
+    """Пишет отписку в журнал для остальных процессов."""
+    try:
+        number = cache.incr(JOURNAL_KEY)
+    except ValueError:
+        # Журнал потерян: начинаем его заново с большого номера,
+        # и все процессы пересоберут граф.
+        cache.set(JOURNAL_KEY, int(time.time()), None)
+    else:
+        cache.set(
+            f'{JOURNAL_KEY}:{number}', (user_id, author_id), JOURNAL_TIMEOUT)
+    with _lock:
+        if _state['graph'] is not None:
+            _state['graph'].remove_edge(user_id, author_id)
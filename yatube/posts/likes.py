@@ -0,0 +1,95 @@
+import random
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
+
+from core.composition import placeholder_renderer
+from . import cached
+from .models import Like, LikeCounter, Post
+
+LIKE_COUNTER_SHARDS: int = 8
+
+
+def change_likes(post_id, delta):
+    """Прибавляет delta к случайному шарду счётчика лайков поста."""
+    shard = random.randrange(LIKE_COUNTER_SHARDS)
+    counters = LikeCounter.objects.filter(post_id=post_id, shard=shard)
+    if counters.update(delta=F('delta') + delta):
+        return
+    try:
+        with transaction.atomic():
+            LikeCounter.objects.create(
+                post_id=post_id, shard=shard, delta=delta)
+    except IntegrityError:
+        # Шард успели создать параллельно.
+        counters.update(delta=F('delta') + delta)
+
+
+def like(user, post):
+    """Ставит лайк; повторный лайк ничего не меняет."""
+    _, created = Like.objects.get_or_create(user=user, post=post)
+    if created:
+        change_likes(post.pk, 1)
+
+
+def unlike(user, post):
+    """Снимает лайк, если он был."""
+    deleted, _ = Like.objects.filter(user=user, post=post).delete()
+    if deleted:
+        change_likes(post.pk, -1)
+
+
+def aggregate_likes():
+    """Сводит шарды счётчиков в Post.likes_count.
+
+    Возвращает количество обновлённых постов.
+    """
+    with transaction.atomic():
+        counters = list(
+            LikeCounter.objects.select_for_update().values_list(
+                'pk', 'post_id', 'delta'))
+        totals = defaultdict(int)
+        for _, post_id, delta in counters:
+            totals[post_id] += delta
+        for post_id, delta in totals.items():
+            if delta:
+                Post.objects.filter(pk=post_id).update(
+                    likes_count=F('likes_count') + delta)
+        LikeCounter.objects.filter(
+            pk__in=[pk for pk, _, _ in counters]).delete()
+    cached.posts.forget(totals)
+    return sum(1 for delta in totals.values() if delta)
+
+
+def liked_post_ids(user, post_ids):
+    """Какие из постов лайкнул пользователь — одним запросом."""
+    if not user.is_authenticated:
+        return set()
+    return set(Like.objects.filter(
+        user=user, post_id__in=post_ids).values_list('post_id', flat=True))
+
+
+def likes_counts(post_ids):
+    """Лайки постов с учётом ещё не сведённых шардов."""
+    pending = Coalesce(Sum('like_counters__delta'), 0)
+    return dict(Post.objects.filter(pk__in=post_ids).annotate(
+        total_likes=F('likes_count') + pending,
+    ).order_by().values_list('pk', 'total_likes'))
+
+
+@placeholder_renderer('likes')
+def render_like_buttons(request, keys):
+    post_ids = [int(key) for key in keys]
+    counts = likes_counts(post_ids)
+    liked = liked_post_ids(request.user, post_ids)
+    return {
+        str(post_id): render_to_string('posts/includes/like_button.html', {
+            'post_id': post_id,
+            'likes': counts[post_id],
+            'liked': post_id in liked,
+        }, request)
+        for post_id in post_ids if post_id in counts
+    }
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.likes import aggregate_likes
+
+
+class Command(BaseCommand):
+    help = 'Сводит шарды счётчиков лайков в посты'
+
+    def handle(self, *args, **options):
+        updated = aggregate_likes()
+        self.stdout.write(f'Обновлено постов: {updated}')
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import ARCHIVE_BATCH_SIZE, archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архив пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Архивировать посты старше стольких дней',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=ARCHIVE_BATCH_SIZE,
+            help='Постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        total = 0
+        for moved in archive_posts(before, options['batch_size']):
+            total += moved
+            self.stdout.write(f'Перенесено в архив: {total}')
+        self.stdout.write(f'Готово, всего в архиве новых постов: {total}')
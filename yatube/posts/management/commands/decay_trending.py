@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import decay_pass
+
+
+class Command(BaseCommand):
+    help = 'Убирает из рейтинга «Популярное» затухшие посты'
+
+    def handle(self, *args, **options):
+        deleted = decay_pass()
+        self.stdout.write(f'Удалено из рейтинга: {deleted}')
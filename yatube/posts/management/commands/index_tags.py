@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Post
+from posts.tags import update_mentions, update_tags
+
+INDEX_BATCH_SIZE: int = 500
+
+
+class Command(BaseCommand):
+    help = 'Заполняет теги и упоминания постов, написанных до их появления'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=INDEX_BATCH_SIZE,
+            help='Постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        last_pk, total = 0, 0
+        while True:
+            with transaction.atomic():
+                posts = list(Post.objects.filter(pk__gt=last_pk).order_by(
+                    'pk').only('pk', 'text', 'pub_date', 'author_id')[
+                        :options['batch_size']])
+                if not posts:
+                    break
+                for post in posts:
+                    update_tags(post)
+                    # Старые упоминания не превращаем в уведомления.
+                    update_mentions(post, notify=False)
+            last_pk = posts[-1].pk
+            total += len(posts)
+            self.stdout.write(f'Обработано постов: {total}')
+        self.stdout.write('Готово')
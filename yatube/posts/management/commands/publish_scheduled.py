@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.publishing import next_due, publish_due
+
+# Дольше этого планировщик не спит: пост могли запланировать раньше.
+MAX_SLEEP: int = 60
+
+
+class Command(BaseCommand):
+    help = 'Публикует отложенные посты, время которых наступило'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не выходить, а ждать следующих постов',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            total = 0
+            published = publish_due()
+            while published:
+                total += published
+                published = publish_due()
+            self.stdout.write(f'Опубликовано: {total}')
+            if not options['loop']:
+                return
+            due = next_due()
+            delay = MAX_SLEEP
+            if due is not None:
+                delay = min(
+                    max((due - timezone.now()).total_seconds(), 0), MAX_SLEEP)
+            time.sleep(delay)
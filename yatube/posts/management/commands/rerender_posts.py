@@ -0,0 +1,40 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.composition import invalidate_pages
+from posts.models import ArchivedPost, Post
+from posts.rendering import RERENDER_BATCH_SIZE, rerender
+
+
+class Command(BaseCommand):
+    help = 'Перерисовывает HTML постов после смены версии отрисовщика'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=RERENDER_BATCH_SIZE,
+            help='Постов в одной транзакции',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Процессов отрисовки, по умолчанию по числу ядер',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать и посты с текущей версией',
+        )
+
+    def handle(self, *args, **options):
+        # spawn: дочерним процессам не достаются соединения с БД.
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(options['workers'], context) as pool:
+            for model in (Post, ArchivedPost):
+                total = 0
+                for count in rerender(
+                        model, pool, options['batch_size'], options['all']):
+                    total += count
+                    self.stdout.write(
+                        f'{model._meta.verbose_name_plural}: {total}')
+        invalidate_pages()
+        self.stdout.write('Готово')
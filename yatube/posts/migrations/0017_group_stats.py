@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0016_postrank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('last_activity', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Последняя активность')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GroupContributor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_contributions', to=settings.AUTH_USER_MODEL)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='contributors', to='posts.Group')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupcontributor',
+            index=models.Index(fields=['group', '-posts_count'], name='group_top_contributors'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupcontributor',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_contributors'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupContributor = apps.get_model('posts', 'GroupContributor')
+    totals = {
+        row['group']: row
+        for row in Post.objects.filter(group__isnull=False).values(
+            'group').annotate(
+            count=Count('pk'), last=Max('pub_date')).order_by()
+    }
+    GroupStats.objects.bulk_create(
+        GroupStats(
+            group_id=pk,
+            posts_count=totals.get(pk, {}).get('count', 0),
+            last_activity=totals.get(pk, {}).get('last'),
+        )
+        for pk in Group.objects.values_list('pk', flat=True)
+    )
+    GroupContributor.objects.bulk_create(
+        GroupContributor(
+            group_id=row['group'],
+            author_id=row['author'],
+            posts_count=row['count'],
+        )
+        for row in Post.objects.filter(group__isnull=False).values(
+            'group', 'author').annotate(count=Count('pk')).order_by()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_group_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
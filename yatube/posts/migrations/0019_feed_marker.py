@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0018_fill_group_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedMarker',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_marker', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('last_seen_post_id', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'id'], name='post_author_id'),
+        ),
+    ]
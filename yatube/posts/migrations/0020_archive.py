@@ -0,0 +1,72 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:14
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0019_feed_marker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Комментарий')),
+                ('created', models.DateTimeField(verbose_name='Дата публикации')),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст поста')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('image', models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка')),
+                ('version', models.PositiveIntegerField(default=1, verbose_name='Версия')),
+                ('likes_count', models.PositiveIntegerField(default=0, verbose_name='Лайки')),
+                ('archived', models.DateTimeField(auto_now_add=True, verbose_name='Дата архивации')),
+            ],
+            options={
+                'verbose_name': 'Архивный пост',
+                'verbose_name_plural': 'Архивные посты',
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['pub_date'], name='post_pub_date'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='group',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='posts.Group', verbose_name='Группа'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор'),
+        ),
+        migrations.AddField(
+            model_name='archivedcomment',
+            name='post',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='posts.ArchivedPost'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedpost',
+            index=models.Index(fields=['author', '-pub_date'], name='archived_post_author'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRevision',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Версия')),
+                ('snapshot', models.BooleanField(default=False, verbose_name='Полный текст')),
+                ('data', models.TextField(verbose_name='Дельта или текст')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата правки')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='posts.Post')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='postrevision',
+            constraint=models.UniqueConstraint(fields=('post', 'number'), name='unique_post_revisions'),
+        ),
+    ]
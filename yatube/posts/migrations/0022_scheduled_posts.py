@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0021_post_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='is_published',
+            field=models.BooleanField(default=True, editable=False, verbose_name='Опубликован'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Опубликовать в'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_published=False), fields=['publish_at'], name='post_publish_due'),
+        ),
+    ]
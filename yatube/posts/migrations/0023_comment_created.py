@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0022_scheduled_posts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created'], name='comment_created'),
+        ),
+    ]
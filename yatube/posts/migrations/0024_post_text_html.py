@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_comment_created'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='renderer_version',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Версия отрисовки'),
+        ),
+        migrations.AddField(
+            model_name='archivedpost',
+            name='text_html',
+            field=models.TextField(default='', verbose_name='HTML текста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='renderer_version',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Версия отрисовки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(default='', editable=False, verbose_name='HTML текста'),
+        ),
+    ]
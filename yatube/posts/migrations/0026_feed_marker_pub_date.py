@@ -0,0 +1,40 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:52
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def fill_last_seen(apps, schema_editor):
+    FeedMarker = apps.get_model('posts', 'FeedMarker')
+    Post = apps.get_model('posts', 'Post')
+    FeedMarker.objects.update(last_seen=Subquery(
+        Post.objects.filter(
+            pk=OuterRef('last_seen_post_id')).values('pub_date')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0025_tags_mentions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_author_id',
+        ),
+        migrations.AddField(
+            model_name='feedmarker',
+            name='last_seen',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(fill_last_seen, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='feedmarker',
+            name='last_seen_post_id',
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date'], name='post_author_pub_date'),
+        ),
+    ]
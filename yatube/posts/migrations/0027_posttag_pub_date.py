@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 12:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+def fill_pub_date(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    PostTag = apps.get_model('posts', 'PostTag')
+    PostTag.objects.update(pub_date=Subquery(
+        Post.objects.filter(pk=OuterRef('post_id')).values('pub_date')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0026_feed_marker_pub_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='posttag',
+            name='pub_date',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата публикации'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_pub_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='posttag',
+            index=models.Index(fields=['tag', 'pub_date', 'post'], name='post_tag_feed'),
+        ),
+    ]
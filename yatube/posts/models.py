@@ -13,8 +13,15 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        """Посты, видимые в лентах: без черновиков, отложенных
+        и постов мягко удалённых пользователей, ждущих очистки."""
+        return self.filter(is_published=True, author__is_active=True)
+
+
 class Post(models.Model):
-    objects = None
+    objects = PostQuerySet.as_manager()
     text = models.TextField(
         'Текст поста',
         help_text='Текст нового поста'
@@ -44,16 +51,84 @@ class Post(models.Model):
         blank=True,
         help_text='Загрузите картинку'
     )
+    # Версия правки: входит в ключ кэша карточки поста.
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=1,
+        editable=False
+    )
+    # Сводится периодически из LikeCounter командой aggregate_likes.
+    likes_count = models.PositiveIntegerField(
+        'Лайки',
+        default=0,
+        editable=False
+    )
+    # Черновик или отложенный пост не виден в лентах.
+    is_published = models.BooleanField(
+        'Опубликован',
+        default=True,
+        editable=False
+    )
+    # Когда опубликовать отложенный пост; у черновика пусто.
+    publish_at = models.DateTimeField(
+        'Опубликовать в',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    # HTML текста отрисовывается при сохранении, а не при показе.
+    text_html = models.TextField(
+        'HTML текста',
+        default='',
+        editable=False
+    )
+    # Версия отрисовщика core.markup; 0 — ещё не отрисован.
+    renderer_version = models.PositiveSmallIntegerField(
+        'Версия отрисовки',
+        default=0,
+        editable=False
+    )
 
     class Meta:
         ordering = ['-pub_date']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            # Счётчик непрочитанного считается только по индексу.
+            models.Index(
+                name='post_author_pub_date', fields=['author', 'pub_date']),
+            # Архивирование выбирает самые старые посты.
+            models.Index(name='post_pub_date', fields=['pub_date']),
+            # Планировщик ищет ближайший отложенный пост: в индексе
+            # только неопубликованные, поэтому он крошечный.
+            models.Index(
+                name='post_publish_due',
+                fields=['publish_at'],
+                condition=models.Q(is_published=False),
+            ),
+        ]
 
     def __str__(self):
         """Выводим текст поста."""
         return str(self.text[:15])
 
+    def save(self, *args, **kwargs):
+        """При правке поста увеличиваем версию карточки.
+
+        HTML текста отрисовывается в pre_save, поэтому при сохранении
+        текста через update_fields записываются и поля отрисовки.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'text' in update_fields:
+            kwargs['update_fields'] = {
+                *update_fields, 'text_html', 'renderer_version'}
+        bump = not self._state.adding and not kwargs.get('update_fields')
+        if bump:
+            self.version = models.F('version') + 1
+        super().save(*args, **kwargs)
+        if bump:
+            self.refresh_from_db(fields=['version'])
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -76,6 +151,12 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            # Для иерархии дат в админке.
+            models.Index(name='comment_created', fields=['created']),
+        ]
+
     def __str__(self):
         return self.text
 
@@ -99,3 +180,300 @@ class Follow(models.Model):
                 fields=['user', 'author'],
             ),
         ]
+
+
+class Like(models.Model):
+    user = models.ForeignKey(
+        User,
+        related_name='likes',
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='likes',
+        on_delete=models.CASCADE,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_likes',
+                fields=['user', 'post'],
+            ),
+        ]
+
+
+class LikeCounter(models.Model):
+    """Шард счётчика лайков поста.
+
+    Лайки копятся в нескольких строках на пост, чтобы запись
+    не упиралась в одну строку горячего поста.
+    """
+    post = models.ForeignKey(
+        Post,
+        related_name='like_counters',
+        on_delete=models.CASCADE,
+    )
+    shard = models.PositiveSmallIntegerField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_like_counter_shards',
+                fields=['post', 'shard'],
+            ),
+        ]
+
+
+class PostRank(models.Model):
+    """Материализованный рейтинг «Популярное».
+
+    score — логарифм суммы весов активности, приведённых к одной
+    эпохе, поэтому сортировка по нему совпадает с сортировкой
+    по затухающему рейтингу в любой момент времени.
+    """
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        related_name='rank',
+        on_delete=models.CASCADE,
+    )
+    score = models.FloatField(db_index=True)
+
+
+class GroupStats(models.Model):
+    """Сводка по группе для каталога групп."""
+    group = models.OneToOneField(
+        Group,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    last_activity = models.DateTimeField(
+        'Последняя активность',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+
+
+class GroupContributor(models.Model):
+    """Сколько постов автор написал в группе."""
+    group = models.ForeignKey(
+        Group,
+        related_name='contributors',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        related_name='group_contributions',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_group_contributors',
+                fields=['group', 'author'],
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='group_top_contributors',
+                fields=['group', '-posts_count'],
+            ),
+        ]
+
+
+class FeedMarker(models.Model):
+    """До какого момента пользователь дочитал ленту подписок.
+
+    Отметка — дата публикации самого нового увиденного поста, а не его
+    id: отложенный пост или черновик получает id при создании, но в
+    ленте появляется позже, с датой публикации.
+    """
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='feed_marker',
+        on_delete=models.CASCADE,
+    )
+    last_seen = models.DateTimeField(null=True)
+
+
+class ArchivedPost(models.Model):
+    """Старый пост, перенесённый из горячей таблицы постов.
+
+    id совпадает с id исходного поста, поэтому ссылки не меняются.
+    Новый пост не может получить id архивного: id постов только
+    растут (AUTOINCREMENT в SQLite, последовательность в PostgreSQL)
+    и не переиспользуются после удаления строк.
+    """
+    id = models.PositiveIntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    text_html = models.TextField('HTML текста', default='')
+    renderer_version = models.PositiveSmallIntegerField(
+        'Версия отрисовки', default=0)
+    pub_date = models.DateTimeField('Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    version = models.PositiveIntegerField('Версия', default=1)
+    likes_count = models.PositiveIntegerField('Лайки', default=0)
+    archived = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+        indexes = [
+            models.Index(
+                name='archived_post_author',
+                fields=['author', '-pub_date'],
+            ),
+        ]
+
+    def __str__(self):
+        return str(self.text[:15])
+
+
+class ArchivedComment(models.Model):
+    id = models.PositiveIntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        related_name='comments',
+        on_delete=models.CASCADE,
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField('Комментарий')
+    created = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['created']
+
+    def __str__(self):
+        return self.text
+
+
+class PostRevision(models.Model):
+    """Прежняя версия текста поста.
+
+    Обычно хранится обратная дельта к следующей версии, а каждая
+    SNAPSHOT_EVERY-я ревизия — текст целиком, чтобы восстановление
+    не проходило всю цепочку.
+    """
+    post = models.ForeignKey(
+        Post,
+        related_name='revisions',
+        on_delete=models.CASCADE,
+    )
+    number = models.PositiveIntegerField('Версия')
+    snapshot = models.BooleanField('Полный текст', default=False)
+    data = models.TextField('Дельта или текст')
+    created = models.DateTimeField('Дата правки', auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_post_revisions',
+                fields=['post', 'number'],
+            ),
+        ]
+
+
+class Tag(models.Model):
+    """Хэштег; имя хранится в нижнем регистре и без решётки."""
+    name = models.CharField('Имя', max_length=50, unique=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = 'Тег'
+        verbose_name_plural = 'Теги'
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    post = models.ForeignKey(
+        Post,
+        related_name='post_tags',
+        on_delete=models.CASCADE,
+    )
+    # Отдельный индекс не нужен: тег — первое поле составного ключа.
+    tag = models.ForeignKey(
+        Tag,
+        related_name='post_tags',
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    # Копия даты публикации поста: лента тега идёт по индексу связки
+    # в том же порядке, что и остальные ленты.
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_post_tags',
+                fields=['tag', 'post'],
+            ),
+        ]
+        indexes = [
+            # Страница тега листается курсором (pub_date, post) по этому
+            # индексу, не заглядывая в таблицу связок.
+            models.Index(
+                name='post_tag_feed', fields=['tag', 'pub_date', 'post']),
+        ]
+
+
+class Mention(models.Model):
+    """Упоминание пользователя в посте; непросмотренное — уведомление."""
+    post = models.ForeignKey(
+        Post,
+        related_name='mentions',
+        on_delete=models.CASCADE,
+    )
+    user = models.ForeignKey(
+        User,
+        related_name='mentions',
+        on_delete=models.CASCADE,
+        db_index=False,
+    )
+    seen = models.BooleanField('Просмотрено', default=False)
+    created = models.DateTimeField('Дата', auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_mentions',
+                fields=['user', 'post'],
+            ),
+        ]
+        indexes = [
+            # Счётчик уведомлений в шапке идёт по крошечному индексу.
+            models.Index(
+                name='mention_unseen',
+                fields=['user', 'post'],
+                condition=models.Q(seen=False),
+            ),
+        ]
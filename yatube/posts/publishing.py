@@ -0,0 +1,67 @@
+from django.db import transaction
+from django.utils import timezone
+
+from core.composition import invalidate_pages
+from . import cached, trending, unread, updates
+from .batch import batch
+from .models import Post
+
+PUBLISH_BATCH_SIZE: int = 500
+
+
+def announce(posts):
+    """Разносит появление постов в лентах: рейтинг, счётчики, непрочитанное.
+
+    Счётчики лент и непрочитанного обновляются одной пачкой на все посты.
+    """
+    for post in posts:
+        trending.record_activity(post.pk, 'post', post.pub_date)
+    updates.record_posts(posts)
+    unread.posts_published(posts)
+
+
+def next_due():
+    """Когда публиковать ближайший отложенный пост.
+
+    Запрос идёт по частичному индексу post_publish_due, в котором
+    только неопубликованные посты, а не по всей таблице.
+    """
+    return Post.objects.filter(
+        is_published=False, publish_at__isnull=False,
+    ).order_by('publish_at').values_list('publish_at', flat=True).first()
+
+
+def publish_due(now=None, batch_size=PUBLISH_BATCH_SIZE):
+    """Публикует пачку наступивших отложенных постов.
+
+    Дата публикации — момент, когда пост действительно появился
+    в лентах, а не запланированное время: иначе пост, опубликованный
+    с опозданием, оказался бы позади отметки прочтения ленты.
+    Посты сохраняются через save(), поэтому сводка групп, теги
+    и подписчики сигналов узнают о публикации как при правке поста.
+    Ленты и кэш страниц обновляются один раз на всю пачку.
+    Возвращает число опубликованных постов.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        posts = list(Post.objects.select_for_update().filter(
+            is_published=False, publish_at__lte=now,
+        ).order_by('publish_at')[:batch_size])
+        with batch():
+            for post in posts:
+                # Прежние значения для сигналов уже известны:
+                # пост только что прочитан под блокировкой.
+                post._old_group_id = post.group_id
+                post._old_text = post.text
+                post._old_pub_date = post.pub_date
+                post._old_is_published = False
+                post.is_published = True
+                post.pub_date = now
+                post.save(update_fields=['is_published', 'pub_date'])
+    if posts:
+        announce(posts)
+        invalidate_pages()
+    # Сигналы сбросили кэш объектов ещё в транзакции: до коммита
+    # его могли заполнить старыми строками.
+    cached.posts.forget([post.pk for post in posts])
+    return len(posts)
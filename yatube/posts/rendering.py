@@ -0,0 +1,41 @@
+from django.db import transaction
+
+from core import markup
+from . import cached
+from .models import Post
+
+RERENDER_BATCH_SIZE: int = 500
+# Постов на одну задачу пула: меньше накладных расходов на пересылку.
+RERENDER_CHUNK_SIZE: int = 50
+
+
+def rerender(model, pool, batch_size=RERENDER_BATCH_SIZE, force=False):
+    """Перерисовывает HTML постов model пачками, отдавая размер пачек.
+
+    Markdown отрисовывается в процессах пула, а записывается короткой
+    транзакцией на пачку и только тем постам, текст которых не успел
+    поменяться: их уже перерисовало сохранение.
+    """
+    manager = model._default_manager
+    queryset = manager.order_by('pk')
+    if not force:
+        queryset = queryset.exclude(renderer_version=markup.RENDERER_VERSION)
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).values_list(
+            'pk', 'text')[:batch_size])
+        if not batch:
+            return
+        last_pk = batch[-1][0]
+        rendered = pool.map(
+            markup.render, [text for _, text in batch],
+            chunksize=RERENDER_CHUNK_SIZE)
+        with transaction.atomic():
+            for (pk, text), text_html in zip(batch, rendered):
+                manager.filter(pk=pk, text=text).update(
+                    text_html=text_html,
+                    renderer_version=markup.RENDERER_VERSION,
+                )
+        if model is Post:
+            cached.posts.forget([pk for pk, _ in batch])
+        yield len(batch)
@@ -0,0 +1,116 @@
+import difflib
+import json
+import re
+
+from django.db.models import Max
+
+from .models import PostRevision
+
+# Каждая такая ревизия хранит текст целиком.
+SNAPSHOT_EVERY: int = 10
+# Больше стольких старых версий поста не храним.
+MAX_REVISIONS: int = 20
+
+TOKENS = re.compile(r'\s+|\S+')
+
+
+def make_delta(new, old):
+    """Обратная дельта: как получить old из new.
+
+    Текст режется на слова и пробелы. Дельта — JSON-список:
+    положительное число — скопировать столько токенов из new,
+    отрицательное — пропустить, строка — вставить.
+    """
+    source, target = TOKENS.findall(new), TOKENS.findall(old)
+    matcher = difflib.SequenceMatcher(None, source, target, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(i1 - i2)
+        if j2 > j1:
+            ops.append(''.join(target[j1:j2]))
+    return json.dumps(ops, ensure_ascii=False, separators=(',', ':'))
+
+
+def apply_delta(new, delta):
+    tokens = TOKENS.findall(new)
+    position = 0
+    result = []
+    for op in json.loads(delta):
+        if isinstance(op, str):
+            result.append(op)
+        elif op > 0:
+            result.extend(tokens[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(result)
+
+
+def current_number(post):
+    """Номер текущей версии текста: следующий за последней ревизией.
+
+    Post.version для этого не годится: она растёт и при правках
+    без текста, и при сбросе кэша карточек.
+    """
+    last = post.revisions.aggregate(last=Max('number'))['last']
+    return (last or 0) + 1
+
+
+def record_revision(post, old_text):
+    """Сохраняет прежний текст поста очередной ревизией."""
+    number = current_number(post)
+    data = make_delta(post.text, old_text)
+    snapshot = number % SNAPSHOT_EVERY == 0 or len(data) >= len(old_text)
+    PostRevision.objects.create(
+        post=post,
+        number=number,
+        snapshot=snapshot,
+        data=old_text if snapshot else data,
+    )
+    PostRevision.objects.filter(
+        post=post, number__lte=number - MAX_REVISIONS).delete()
+
+
+def _restore(text, revision):
+    return revision.data if revision.snapshot else apply_delta(
+        text, revision.data)
+
+
+def text_at(post, number):
+    """Текст версии number: от ближайшего снимка, а не от текущей."""
+    if number == current_number(post):
+        return post.text
+    revisions = []
+    for revision in post.revisions.filter(
+            number__gte=number).order_by('number'):
+        revisions.append(revision)
+        if revision.snapshot:
+            break
+    if not revisions or revisions[0].number != number:
+        return None
+    text = post.text
+    for revision in reversed(revisions):
+        text = _restore(text, revision)
+    return text
+
+
+def history(post):
+    """Версии поста от новой к старой: (номер, текст, diff с прежней)."""
+    older = list(post.revisions.order_by('-number'))
+    current = older[0].number + 1 if older else 1
+    versions = [(current, post.text)]
+    for revision in older:
+        versions.append((revision.number, _restore(versions[-1][1], revision)))
+    result = []
+    for (number, text), (_, older) in zip(versions, versions[1:]):
+        diff = difflib.unified_diff(
+            older.splitlines(), text.splitlines(), lineterm='', n=1)
+        # Первые две строки — заголовки файлов, они не нужны.
+        result.append((number, text, '\n'.join(list(diff)[2:])))
+    number, text = versions[-1]
+    result.append((number, text, ''))
+    return result
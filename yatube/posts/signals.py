@@ -0,0 +1,175 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core import markup
+from core.composition import invalidate_pages
+from . import (
+    graph, publishing, revisions, stats, tags, trending, unread
+)
+from .batch import in_batch
+from .models import Comment, Follow, Group, GroupStats, Like, Post, User
+
+# Поля, которые выводятся в карточке поста.
+CARD_USER_FIELDS = ('username', 'first_name', 'last_name')
+CARD_GROUP_FIELDS = ('title', 'slug')
+
+
+def _fields_changed(instance, fields, update_fields):
+    """Проверяет, изменились ли поля экземпляра относительно БД."""
+    if instance.pk is None:
+        return False
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return False
+    old = type(instance).objects.filter(
+        pk=instance.pk).values_list(*fields).first()
+    new = tuple(getattr(instance, field) for field in fields)
+    return old is not None and old != new
+
+
+def bump_card_version(**filters):
+    """Сбрасывает кэш карточек постов, подходящих под фильтр."""
+    Post.objects.filter(**filters).update(version=F('version') + 1)
+
+
+@receiver(pre_save, sender=User)
+def user_renamed(sender, instance, update_fields=None, **kwargs):
+    if _fields_changed(instance, CARD_USER_FIELDS, update_fields):
+        bump_card_version(author_id=instance.pk)
+        invalidate_pages()
+
+
+@receiver(pre_save, sender=Group)
+def group_renamed(sender, instance, update_fields=None, **kwargs):
+    if _fields_changed(instance, CARD_GROUP_FIELDS, update_fields):
+        bump_card_version(group_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    # Посты останутся без группы (SET_NULL), ссылка в карточке устареет.
+    bump_card_version(group_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def content_changed(sender, **kwargs):
+    # Страницы с «дырками» кэшируются целиком, сбрасываем их все.
+    if not in_batch():
+        invalidate_pages()
+
+
+@receiver(post_save, sender=Post)
+def post_published(sender, instance, created, **kwargs):
+    # Пост появляется в лентах при создании или при публикации черновика.
+    if in_batch():
+        return
+    was_published = getattr(instance, '_old_is_published', False)
+    if instance.is_published and (created or not was_published):
+        publishing.announce([instance])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Like)
+def activity_created(sender, instance, created, **kwargs):
+    if created:
+        trending.record_activity(
+            instance.post_id, sender._meta.model_name)
+
+
+@receiver(post_save, sender=Group)
+def group_created(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_post(sender, instance, **kwargs):
+    # Запоминаем прежние группу и текст: для сводки групп и истории.
+    if in_batch() and hasattr(instance, '_old_is_published'):
+        # Прежние значения проставил тот, кто ведёт пачку.
+        return
+    instance._old_group_id = instance._old_text = None
+    instance._old_pub_date = None
+    instance._old_is_published = False
+    if not instance._state.adding:
+        old = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'text', 'pub_date', 'is_published').first()
+        if old is not None:
+            (instance._old_group_id, instance._old_text,
+             instance._old_pub_date, instance._old_is_published) = old
+
+
+@receiver(pre_save, sender=Post)
+def render_post_text(sender, instance, update_fields=None, **kwargs):
+    # Markdown отрисовывается один раз здесь, страницы берут готовый HTML.
+    if update_fields is not None and 'text' not in update_fields:
+        return
+    if (instance.text != instance._old_text
+            or instance.renderer_version != markup.RENDERER_VERSION):
+        instance.text_html = markup.render(instance.text)
+        instance.renderer_version = markup.RENDERER_VERSION
+
+
+@receiver(post_save, sender=Post)
+def post_group_stats(sender, instance, created, **kwargs):
+    # В сводке групп считаются только опубликованные посты.
+    old_group_id = None
+    if getattr(instance, '_old_is_published', False):
+        old_group_id = instance._old_group_id
+    new_group_id = instance.group_id if instance.is_published else None
+    if old_group_id == new_group_id:
+        return
+    if old_group_id is not None:
+        stats.change_group_stats(old_group_id, instance.author_id, -1)
+    if new_group_id is not None:
+        stats.change_group_stats(
+            new_group_id, instance.author_id, 1, instance.pub_date)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted_group_stats(sender, instance, **kwargs):
+    if in_batch():
+        return
+    if instance.is_published and instance.group_id is not None:
+        stats.change_group_stats(instance.group_id, instance.author_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if created:
+        graph.follow_added(instance.user_id, instance.author_id)
+        unread.forget(instance.user_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    graph.follow_removed(instance.user_id, instance.author_id)
+    unread.forget(instance.user_id)
+
+
+@receiver(post_save, sender=Post)
+def post_text_changed(sender, instance, created, **kwargs):
+    old_text = getattr(instance, '_old_text', None)
+    if not created and old_text is not None and old_text != instance.text:
+        revisions.record_revision(instance, old_text)
+
+
+@receiver(post_save, sender=Post)
+def post_tags_changed(sender, instance, created, **kwargs):
+    # Теги и упоминания пересчитываются, только если поменялся текст.
+    if created or instance.text != getattr(instance, '_old_text', None):
+        tags.update_tags(instance)
+        tags.update_mentions(instance)
+    # При публикации черновика меняется дата, по ней идут ленты тегов.
+    old_pub_date = getattr(instance, '_old_pub_date', None)
+    if old_pub_date is not None and old_pub_date != instance.pub_date:
+        tags.update_tag_dates(instance)
@@ -0,0 +1,48 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import GroupContributor, GroupStats
+
+TOP_CONTRIBUTORS: int = 3
+
+
+def change_group_stats(group_id, author_id, delta, when=None):
+    """Учитывает добавление (delta=1) или удаление (delta=-1) поста."""
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.update(posts_count=F('posts_count') + delta)
+    if when is not None:
+        stats.filter(
+            Q(last_activity__isnull=True) | Q(last_activity__lt=when)
+        ).update(last_activity=when)
+    contributor = GroupContributor.objects.filter(
+        group_id=group_id, author_id=author_id)
+    if delta < 0:
+        contributor.update(posts_count=F('posts_count') + delta)
+        contributor.filter(posts_count__lte=0).delete()
+    elif not contributor.update(posts_count=F('posts_count') + delta):
+        try:
+            with transaction.atomic():
+                GroupContributor.objects.create(
+                    group_id=group_id, author_id=author_id,
+                    posts_count=delta)
+        except IntegrityError:
+            # Строку автора успели создать параллельно.
+            contributor.update(posts_count=F('posts_count') + delta)
+
+
+def top_contributors(group_ids):
+    """Самые активные авторы групп одним запросом по сводной таблице."""
+    third = GroupContributor.objects.filter(
+        group=OuterRef('group')).order_by('-posts_count').values(
+        'posts_count')[TOP_CONTRIBUTORS - 1:TOP_CONTRIBUTORS]
+    contributors = GroupContributor.objects.filter(
+        group_id__in=group_ids,
+        posts_count__gte=Coalesce(Subquery(third), 0),
+    ).select_related('author').order_by('group_id', '-posts_count')
+    result = {}
+    for contributor in contributors:
+        top = result.setdefault(contributor.group_id, [])
+        if len(top) < TOP_CONTRIBUTORS:
+            top.append(contributor)
+    return result
@@ -0,0 +1,112 @@
+import re
+from datetime import datetime
+
+from django.db.models import F, Q
+
+from .models import Mention, Post, PostTag, Tag, User
+
+# Решётка внутри слова, адреса или HTML-сущности — не тег.
+TAG_RE = re.compile(r'(?<![\w&/#])#(\w+)')
+# Длинное слово после решётки — не тег: обрезанным его не сохраняем.
+TAG_MAX_LENGTH = Tag._meta.get_field('name').max_length
+# Перед @ не буква: иначе это почта. Точка в конце — конец фразы.
+MENTION_RE = re.compile(r'(?<![\w@/])@([\w.@+-]{0,149}\w)')
+TAG_PAGE_SIZE: int = 10
+CURSOR_FORMAT = '%Y%m%d%H%M%S%f'
+
+
+def extract_tags(text):
+    return {
+        name.lower() for name in TAG_RE.findall(text)
+        if len(name) <= TAG_MAX_LENGTH
+    }
+
+
+def extract_mentions(text):
+    return set(MENTION_RE.findall(text))
+
+
+def update_tags(post):
+    """Приводит теги поста к его тексту, трогая только изменившиеся."""
+    new = extract_tags(post.text)
+    old = set(PostTag.objects.filter(post=post).values_list(
+        'tag__name', flat=True))
+    if old - new:
+        PostTag.objects.filter(post=post, tag__name__in=old - new).delete()
+    if new - old:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in new - old], ignore_conflicts=True)
+        PostTag.objects.bulk_create([
+            PostTag(post=post, tag=tag, pub_date=post.pub_date)
+            for tag in Tag.objects.filter(name__in=new - old)
+        ], ignore_conflicts=True)
+
+
+def update_mentions(post, notify=True):
+    """Приводит упоминания поста к его тексту.
+
+    Уведомление получают только новые упомянутые: правка поста
+    не будит тех, кто уже был в нём упомянут. Себя не упоминают.
+    """
+    new = extract_mentions(post.text)
+    old = set(Mention.objects.filter(post=post).values_list(
+        'user__username', flat=True))
+    if old - new:
+        Mention.objects.filter(
+            post=post, user__username__in=old - new).delete()
+    if new - old:
+        users = User.objects.filter(
+            username__in=new - old, is_active=True,
+        ).exclude(pk=post.author_id)
+        Mention.objects.bulk_create([
+            Mention(post=post, user=user, seen=not notify) for user in users
+        ], ignore_conflicts=True)
+
+
+def make_cursor(post):
+    return '{:{}}_{}'.format(post.pub_date, CURSOR_FORMAT, post.pk)
+
+
+def parse_cursor(value):
+    """(pub_date, id) из курсора страницы тега; None, если он испорчен."""
+    pub_date, _, pk = (value or '').partition('_')
+    try:
+        return datetime.strptime(pub_date, CURSOR_FORMAT), int(pk)
+    except ValueError:
+        return None
+
+
+def tag_page(tag, before=None):
+    """Страница постов тега от новых к старым и курсор следующей.
+
+    Порядок тот же, что в остальных лентах: по дате публикации,
+    при равной дате — по id. Курсор — (pub_date, id) последнего
+    поста страницы: выборка идёт по индексу (tag, pub_date, post)
+    без OFFSET, сколько бы постов ни было у тега.
+    """
+    # Фильтр и сортировка по столбцам связки, а не posts_post:
+    # иначе SQLite досортировывает выборку во временном B-дереве.
+    conditions = [Q(post_tags__tag=tag)]
+    if before is not None:
+        pub_date, pk = before
+        conditions += [
+            Q(post_tags__pub_date__lte=pub_date),
+            Q(post_tags__pub_date__lt=pub_date)
+            | Q(post_tags__post_id__lt=pk),
+        ]
+    posts = Post.objects.published().filter(*conditions).select_related(
+        'author', 'group').order_by(
+            F('post_tags__pub_date').desc(), F('post_tags__post_id').desc())
+    size = TAG_PAGE_SIZE
+    posts = list(posts[:size + 1])
+    cursor = make_cursor(posts[size - 1]) if len(posts) > size else None
+    return posts[:size], cursor
+
+
+def update_tag_dates(post):
+    PostTag.objects.filter(post=post).update(pub_date=post.pub_date)
+
+
+def unseen_mentions(user):
+    return Mention.objects.filter(
+        user=user, seen=False, post__is_published=True).count()
@@ -0,0 +1,13 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from ..cards import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, show_author_link=True, show_group_link=True):
+    """Возвращает HTML карточек постов страницы из кэша."""
+    cards = render_cards(list(posts), show_author_link, show_group_link)
+    return [mark_safe(card) for card in cards]
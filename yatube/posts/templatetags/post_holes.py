@@ -0,0 +1,52 @@
+from django import template
+
+from .. import tags, unread, updates
+from ..forms import CommentForm
+from ..graph import get_follow_graph
+from ..models import User
+
+register = template.Library()
+
+
+@register.filter
+def follows(user, author):
+    """Подписан ли пользователь на автора."""
+    return (
+        user.is_authenticated
+        and author.following.filter(user=user).exists())
+
+
+@register.simple_tag
+def comment_form():
+    """Пустая форма комментария для фрагмента страницы поста."""
+    return CommentForm()
+
+
+@register.simple_tag
+def follow_suggestions(user, limit=5):
+    """Кого посоветовать: на них подписаны авторы из подписок юзера."""
+    if not user.is_authenticated:
+        return []
+    ids = get_follow_graph().suggestions(user.pk, limit)
+    users = User.objects.in_bulk(ids)
+    return [users[pk] for pk in ids if pk in users]
+
+
+@register.simple_tag
+def unread_posts(user):
+    """Метка непрочитанных постов в ленте подписок: '', '5', '99+'."""
+    count = unread.unread_count(user)
+    return unread.unread_label(count) if count else ''
+
+
+@register.simple_tag
+def unseen_mentions(user):
+    """Число непросмотренных упоминаний пользователя."""
+    return tags.unseen_mentions(user)
+
+
+@register.simple_tag
+def feed_watermark(user, feed, group=None):
+    """Счётчик новых постов ленты на момент отрисовки страницы."""
+    group_id = group.pk if group else ''
+    return updates.watermark(updates.scopes_for(user, feed, group_id)())
@@ -0,0 +1,183 @@
+import json
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import paginator
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class AdminQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            number = User.objects.count()
+            user = User.objects.create_user(username=f'user_{number}')
+            group = Group.objects.create(
+                title=f'Группа {number}', slug=f'group-{number}')
+            post = Post.objects.create(
+                author=user, group=group, text=f'Пост {number}')
+            Comment.objects.create(post=post, author=user, text='Коммент')
+            Follow.objects.create(user=user, author=self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_queries_do_not_grow_with_rows(self):
+        """Число запросов страниц админки не зависит от числа строк."""
+        self.add_rows(1)
+        post = Post.objects.first()
+        urls = [
+            reverse('admin:posts_post_changelist'),
+            reverse('admin:posts_comment_changelist'),
+            reverse('admin:posts_follow_changelist'),
+            reverse('admin:posts_group_changelist'),
+            reverse('admin:posts_post_change', args=[post.pk]),
+            reverse(
+                'admin:posts_comment_change', args=[post.comments.get().pk]),
+            reverse(
+                'admin:posts_follow_change', args=[Follow.objects.get().pk]),
+        ]
+        # Первый проход прогревает кэш типов содержимого.
+        for url in urls:
+            self.count_queries(url)
+        before = [self.count_queries(url) for url in urls]
+        self.add_rows(10)
+        after = [self.count_queries(url) for url in urls]
+        self.assertEqual(before, after)
+
+    def test_no_full_user_select(self):
+        """Форма поста не выводит всех пользователей в выпадающем списке."""
+        self.add_rows(3)
+        post = Post.objects.first()
+        other = User.objects.exclude(pk__in=[post.author_id, self.admin.pk])
+        response = self.client.get(
+            reverse('admin:posts_post_change', args=[post.pk]))
+        self.assertContains(response, f'>{post.author.username}</option>')
+        self.assertNotContains(
+            response, f'>{other.first().username}</option>')
+
+    @mock.patch.object(paginator, 'COUNT_LIMIT', 5)
+    def test_count_over_limit_is_estimated(self):
+        """За пределом подсчёта число строк оценивается и помечается."""
+        self.add_rows(7)
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(response.context['cl'].result_count, 7)
+        self.assertTrue(response.context['cl'].paginator.approximate)
+        self.assertContains(response, '&asymp;&nbsp;7')
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'Пост'})
+        self.assertEqual(response.context['cl'].result_count, 6)
+        self.assertContains(response, '&asymp;&nbsp;6')
+        response = self.client.get(
+            reverse('admin:posts_group_changelist'))
+        self.assertNotContains(response, '&asymp;')
+        post_admin = admin.site._registry[Post]
+        with mock.patch.object(post_admin, 'list_per_page', 2):
+            response = self.client.get(
+                reverse('admin:posts_post_changelist'), {'q': 'Пост', 'p': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['cl'].result_list), 1)
+
+    @mock.patch.object(paginator, 'COUNT_LIMIT', 3)
+    def test_pages_past_estimate_reachable(self):
+        """Страницы за оценкой открываются, пока в выборке есть строки."""
+        self.add_rows(7)
+        pages = paginator.EstimatedCountPaginator(
+            Post.objects.filter(text__startswith='Пост').order_by('pk'), 2)
+        self.assertEqual(pages.count, 4)
+        self.assertEqual(pages.num_pages, 2)
+        self.assertEqual(
+            list(pages.page(4)), [Post.objects.order_by('pk').last()])
+        with self.assertRaises(paginator.EmptyPage):
+            pages.page(5)
+
+
+class AdminExportTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        for number in range(3):
+            Post.objects.create(
+                author=cls.admin, text=f'Пост, "{number}"',
+                group=cls.group if number else None)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_export_filtered_changelist(self):
+        """Кнопка выгружает отфильтрованный список потоком."""
+        url = reverse('admin:posts_post_export', args=['csv'])
+        response = self.client.get(url, {'q': '"2"'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,pub_date,author__username,'
+                                   'group__slug,text,is_published')
+        self.assertEqual(len(lines), 2)
+        self.assertIn('admin,test-slug,"Пост, ""2""",True', lines[1])
+
+    def test_export_csv_escapes_formulas(self):
+        """Формулы в CSV выгружаются текстом, в JSON Lines — как есть."""
+        text = '=HYPERLINK("http://example.com","Жми")'
+        Post.objects.create(author=self.admin, text=text)
+        response = self.client.get(
+            reverse('admin:posts_post_export', args=['csv']), {'q': 'HYPER'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertIn(
+            '"\'=HYPERLINK(""http://example.com"",""Жми"")"', lines[1])
+        response = self.client.get(
+            reverse('admin:posts_post_export', args=['jsonl']),
+            {'q': 'HYPER'})
+        row = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(row['text'], text)
+
+    def test_export_action_jsonl(self):
+        posts = Post.objects.order_by('pk')
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'), {
+                'action': 'export_jsonl',
+                '_selected_action': [post.pk for post in posts[:2]],
+            })
+        with CaptureQueriesContext(connection) as queries:
+            rows = [
+                json.loads(line) for line in response.streaming_content]
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([row['id'] for row in rows], [
+            post.pk for post in posts[:2]])
+        self.assertIsNone(rows[0]['group__slug'])
+        self.assertEqual(rows[1]['group__slug'], 'test-slug')
+
+    def test_changelist_has_export_links(self):
+        response = self.client.get(
+            reverse('admin:posts_follow_changelist'))
+        self.assertContains(
+            response, reverse('admin:posts_follow_export', args=['jsonl']))
+
+    def test_unknown_format(self):
+        response = self.client.get(
+            reverse('admin:posts_comment_export', args=['xml']))
+        self.assertEqual(response.status_code, 404)
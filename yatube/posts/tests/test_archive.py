@@ -0,0 +1,124 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import archive, likes, signals
+from ..archive import ChainedPosts, archive_batch
+from ..models import (
+    ArchivedComment, ArchivedPost, Comment, Group, GroupContributor,
+    GroupStats, Like, Mention, Post, PostRank, PostRevision, PostTag
+)
+
+User = get_user_model()
+
+
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.old_post = Post.objects.create(
+            author=cls.author, text='Старый пост')
+        Comment.objects.create(
+            post=cls.old_post, author=cls.author, text='Старый комментарий')
+        cls.new_post = Post.objects.create(
+            author=cls.author, text='Свежий пост')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_archive_moves_old_posts(self):
+        """Старые посты и их комментарии переезжают в архив."""
+        call_command('archive_posts', days=365, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new_post.pk).exists())
+        archived = ArchivedPost.objects.get(pk=self.old_post.pk)
+        self.assertEqual(archived.text, 'Старый пост')
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old_post.pk)
+        self.assertEqual(archive_batch(timezone.now() - timedelta(days=1)), 0)
+
+    def test_new_post_ids_not_reused(self):
+        """После архивации самого нового поста его id не достаётся новому."""
+        archive_batch(timezone.now() + timedelta(days=1))
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertGreater(post.pk, self.new_post.pk)
+        self.assertFalse(ArchivedPost.objects.filter(pk=post.pk).exists())
+
+    def test_related_rows_not_archived(self):
+        """Лайки сводятся в счётчик, прочие связанные строки удаляются."""
+        reader = User.objects.create_user(username='reader')
+        post = self.old_post
+        post.text = 'Старый пост #архив @reader'
+        post.save()
+        likes.like(reader, post)
+        PostRank.objects.update_or_create(post=post, defaults={'score': 1})
+        self.assertEqual(PostRevision.objects.filter(post=post).count(), 1)
+        self.assertEqual(PostTag.objects.filter(post=post).count(), 1)
+        self.assertEqual(Mention.objects.filter(post=post).count(), 1)
+        Post.objects.filter(pk=post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400))
+        archive_batch(timezone.now() - timedelta(days=365))
+        self.assertEqual(ArchivedPost.objects.get(pk=post.pk).likes_count, 1)
+        for model in (Like, PostRank, PostRevision, PostTag, Mention):
+            with self.subTest(model=model.__name__):
+                self.assertFalse(model.objects.filter(post=post.pk).exists())
+
+    def test_batch_updates_once(self):
+        """Пачка сбрасывает кэш страниц и меняет сводку групп по разу."""
+        group = Group.objects.create(title='Группа', slug='group')
+        old = timezone.now() - timedelta(days=400)
+        for number in range(3):
+            post = Post.objects.create(
+                author=self.author, group=group, text=f'Пост {number}')
+            Comment.objects.create(
+                post=post, author=self.author, text='Комментарий')
+            Post.objects.filter(pk=post.pk).update(pub_date=old)
+        self.assertEqual(GroupStats.objects.get().posts_count, 3)
+        invalidate = mock.Mock()
+        change = mock.Mock(wraps=archive.stats.change_group_stats)
+        with mock.patch.object(signals, 'invalidate_pages', invalidate), \
+                mock.patch.object(archive, 'invalidate_pages', invalidate), \
+                mock.patch.object(archive.stats, 'change_group_stats', change):
+            moved = archive_batch(timezone.now() - timedelta(days=365))
+        self.assertEqual(moved, 4)
+        invalidate.assert_called_once_with()
+        change.assert_called_once_with(group.pk, self.author.pk, -3)
+        self.assertEqual(GroupStats.objects.get().posts_count, 0)
+        self.assertFalse(GroupContributor.objects.exists())
+
+    def test_pages_fall_back_to_archive(self):
+        """Страница поста и профиль находят архивные посты."""
+        archive_batch(timezone.now() - timedelta(days=365))
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old_post.pk}))
+        self.assertContains(response, 'Старый пост')
+        self.assertContains(response, 'Старый комментарий')
+        self.assertTrue(response.context['archived'])
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'auth_author'}))
+        self.assertEqual(response.context['count_author_posts'], 2)
+        self.assertEqual(
+            [post.text for post in response.context['page_obj']],
+            ['Свежий пост', 'Старый пост'],
+        )
+
+    def test_chained_slices(self):
+        """Срезы идут через границу горячих и архивных постов."""
+        chained = ChainedPosts(
+            Post.objects.order_by('pk'), Post.objects.order_by('-pk'))
+        pks = [self.old_post.pk, self.new_post.pk]
+        self.assertEqual(chained.count(), 4)
+        self.assertEqual(
+            [post.pk for post in chained[1:3]], [pks[1], pks[1]])
+        self.assertEqual(
+            [post.pk for post in chained[3:]], [pks[0]])
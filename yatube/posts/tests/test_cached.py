@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from users.purge import soft_delete
+from .. import cached
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class ObjectCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_post_with_related_from_cache(self):
+        """Пост, автор и группа со второго раза берутся из кэша."""
+        cached.posts.get(self.post.pk)
+        with self.assertNumQueries(0):
+            post = cached.posts.get(self.post.pk)
+            self.assertEqual(post.author.username, 'auth_author')
+            self.assertEqual(post.group.slug, 'test-slug')
+
+    def test_get_many(self):
+        other = Post.objects.create(author=self.author, text='Другой пост')
+        cached.posts.get(self.post.pk)
+        with self.assertNumQueries(1):
+            posts = cached.posts.get_many([self.post.pk, other.pk, 999])
+        self.assertEqual(set(posts), {self.post.pk, other.pk})
+
+    def test_missing_slug_is_cached(self):
+        """Несуществующий адрес не доходит до базы повторно."""
+        self.assertIsNone(cached.groups.get_by('slug', 'nope'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(cached.groups.get_by('slug', 'nope'))
+        Group.objects.create(title='Новая', slug='nope')
+        self.assertEqual(cached.groups.get_by('slug', 'nope').title, 'Новая')
+
+    def test_invalidated_on_save(self):
+        cached.groups.get_by('slug', 'test-slug')
+        self.group.slug = 'renamed'
+        self.group.save()
+        self.assertIsNone(cached.groups.get_by('slug', 'test-slug'))
+        self.assertEqual(
+            cached.groups.get_by('slug', 'renamed').pk, self.group.pk)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.assertEqual(cached.posts.get(self.post.pk).text, 'Новый текст')
+
+    def test_views_use_cache(self):
+        client = Client()
+        post_url = reverse('posts:post_detail', args=[self.post.pk])
+        profile_url = reverse('posts:profile', args=['auth_author'])
+        client.get(profile_url)
+        self.assertEqual(client.get(post_url).status_code, 200)
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertEqual(client.get(post_url).status_code, 404)
+        soft_delete(self.author)
+        self.assertEqual(client.get(profile_url).status_code, 404)
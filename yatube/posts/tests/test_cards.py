@@ -0,0 +1,72 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..cards import card_key, render_cards
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='auth_user', first_name='Иван')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст поста',
+            group=cls.group,
+        )
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': cls.user.username})
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_card_rendered_once(self):
+        """Карточка сохраняется в кэш и берется из него."""
+        render_cards([self.post])
+        key = card_key(self.post, True, True)
+        self.assertIn('Тестовый текст поста', cache.get(key))
+        cache.set(key, 'из кэша')
+        self.assertEqual(render_cards([self.post]), ['из кэша'])
+
+    def test_post_edit_invalidates_card(self):
+        """После правки поста карточка отрисовывается заново."""
+        self.guest_client.get(self.profile_url)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Исправленный текст'},
+        )
+        response = self.guest_client.get(self.profile_url)
+        self.assertContains(response, 'Исправленный текст')
+
+    def test_rename_invalidates_card(self):
+        """Переименование автора и группы сбрасывает карточку."""
+        self.guest_client.get(self.profile_url)
+        self.user.first_name = 'Пётр'
+        self.user.save()
+        self.group.title = 'Новое название'
+        self.group.save()
+        response = self.guest_client.get(self.profile_url)
+        self.assertContains(response, 'Пётр')
+        self.assertContains(response, 'Новое название')
+
+    def test_group_delete_invalidates_card(self):
+        """После удаления группы ссылка на неё пропадает из карточки."""
+        group = Group.objects.create(title='Временная', slug='temp')
+        Post.objects.create(author=self.user, text='Пост', group=group)
+        self.guest_client.get(self.profile_url)
+        group.delete()
+        response = self.guest_client.get(self.profile_url)
+        self.assertNotContains(response, 'Временная')
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class HolePunchedPagesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый текст поста',
+        )
+        cls.post_url = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk})
+        cls.edit_url = reverse(
+            'posts:post_edit', kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        cache.clear()
+
+    def test_cached_page_has_user_holes(self):
+        """Страница из кэша получает шапку и кнопки текущего юзера."""
+        self.guest_client.get(self.post_url)
+        response = self.author_client.get(self.post_url)
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertTemplateUsed(response, 'includes/header.html')
+        self.assertContains(response, 'Пользователь: auth_author')
+        self.assertContains(response, self.edit_url)
+        response = self.authorized_client.get(self.post_url)
+        self.assertContains(response, 'Пользователь: auth_user')
+        self.assertNotContains(response, self.edit_url)
+
+    def test_follow_button_hole(self):
+        """Кнопка подписки на закэшированном профиле своя у каждого."""
+        profile_url = reverse(
+            'posts:profile', kwargs={'username': self.author.username})
+        self.author_client.get(profile_url)
+        response = self.authorized_client.get(profile_url)
+        self.assertContains(response, 'Подписаться')
+        response = self.author_client.get(profile_url)
+        self.assertNotContains(response, 'Подписаться')
+
+    def test_new_comment_invalidates_page(self):
+        """Новый комментарий сбрасывает закэшированные страницы."""
+        self.guest_client.get(self.post_url)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Свежий комментарий')
+        response = self.guest_client.get(self.post_url)
+        self.assertContains(response, 'Свежий комментарий')
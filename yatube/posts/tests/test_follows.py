@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..follows import followed_author_ids
+from ..graph import get_follow_graph, reset_follow_graph
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FollowsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.authors = [
+            User.objects.create_user(username=f'author_{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text='Тестовый текст')
+        Follow.objects.create(user=cls.user, author=cls.authors[0])
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+        reset_follow_graph()
+
+    def test_followed_author_ids_one_query(self):
+        """Состояние подписок всех авторов страницы — одним запросом."""
+        ids = [author.pk for author in self.authors]
+        with self.assertNumQueries(1):
+            followed = followed_author_ids(self.user, ids)
+        self.assertEqual(followed, {self.authors[0].pk})
+
+    def test_feed_cards_have_follow_buttons(self):
+        """В ленте у карточек есть кнопки подписки текущего юзера."""
+        self.client.get(reverse('posts:index'))
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Отписаться', count=1)
+        self.assertContains(response, 'Подписаться', count=2)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'Подписаться')
+
+    def test_bulk_follow_and_unfollow(self):
+        """Подписка и отписка на нескольких авторов одним запросом."""
+        usernames = [author.username for author in self.authors]
+        get_follow_graph()
+        response = self.authorized_client.post(
+            reverse('posts:follow_many'),
+            {'author': usernames + ['auth_user', 'nobody']},
+        )
+        self.assertRedirects(response, reverse('posts:follow_index'))
+        self.assertEqual(Follow.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(get_follow_graph().following_count(self.user.pk), 3)
+        self.authorized_client.post(
+            reverse('posts:unfollow_many'),
+            {'author': usernames[:2], 'next': reverse('posts:index')},
+        )
+        self.assertEqual(
+            list(Follow.objects.filter(user=self.user).values_list(
+                'author__username', flat=True)),
+            ['author_2'],
+        )
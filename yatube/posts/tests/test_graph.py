@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import graph
+from ..graph import FollowGraph, get_follow_graph
+from ..models import Follow
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    def test_csr_queries(self):
+        """Граф отвечает на запросы о подписках."""
+        follow_graph = FollowGraph([(1, 2), (1, 3), (2, 1), (2, 4), (3, 4)])
+        self.assertTrue(follow_graph.is_following(1, 3))
+        self.assertFalse(follow_graph.is_following(3, 1))
+        self.assertEqual(follow_graph.following_count(1), 2)
+        self.assertEqual(follow_graph.followers_count(4), 2)
+        self.assertEqual(follow_graph.followers_count(100), 0)
+        self.assertEqual(follow_graph.mutual(1), {2})
+        self.assertEqual(follow_graph.suggestions(1), [4])
+
+    def test_overlay_changes(self):
+        """Подписки и отписки после сборки учитываются."""
+        follow_graph = FollowGraph([(1, 2)])
+        follow_graph.remove_edge(1, 2)
+        follow_graph.add_edge(1, 5)
+        follow_graph.add_edge(1, 5)
+        self.assertEqual(follow_graph.following(1), {5})
+        self.assertEqual(follow_graph.followers_count(5), 1)
+        follow_graph.add_edge(1, 2)
+        self.assertEqual(follow_graph.following_count(1), 2)
+        self.assertEqual(follow_graph.overlay, 2)
+
+
+class FollowGraphRefreshTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(username=f'user_{index}')
+            for index in range(4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        graph.reset_follow_graph()
+
+    def test_refresh_from_other_process(self):
+        """Граф догоняет подписки и отписки, сделанные не в процессе."""
+        first, second, third, _ = self.users
+        Follow.objects.create(user=first, author=second)
+        follow_graph = get_follow_graph()
+        # bulk_create не шлёт сигналов, как и запись в другом процессе.
+        Follow.objects.bulk_create([Follow(user=first, author=third)])
+        Follow.objects.filter(user=first, author=second).delete()
+        # Отписку другой процесс узнаёт только из журнала.
+        follow_graph.add_edge(first.pk, second.pk)
+        follow_graph = graph._refresh(follow_graph)
+        self.assertEqual(follow_graph.following(first.pk), {third.pk})
+
+    def test_who_to_follow(self):
+        """На странице подписок есть рекомендации друзей друзей."""
+        first, second, third, fourth = self.users
+        Follow.objects.create(user=first, author=second)
+        Follow.objects.create(user=second, author=third)
+        client = Client()
+        client.force_login(first)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Кого почитать')
+        self.assertContains(
+            response, reverse('posts:profile', args=[third.username]))
+        self.assertNotContains(
+            response, reverse('posts:profile', args=[fourth.username]))
@@ -0,0 +1,64 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, GroupContributor, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupDirectoryTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(username=f'user_{index}')
+            for index in range(4)
+        ]
+        cls.group = Group.objects.create(title='Котики', slug='cats')
+        cls.other_group = Group.objects.create(title='Собачки', slug='dogs')
+        for index, user in enumerate(cls.users):
+            for _ in range(index + 1):
+                Post.objects.create(author=user, text='Пост', group=cls.group)
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_stats_follow_posts(self):
+        """Сводка меняется при создании, переносе и удалении постов."""
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 10)
+        self.assertIsNotNone(stats.last_activity)
+        post = Post.objects.filter(author=self.users[0]).get()
+        post.group = self.other_group
+        post.save()
+        post = Post.objects.filter(author=self.users[1]).first()
+        post.delete()
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 8)
+        self.assertEqual(
+            GroupStats.objects.get(group=self.other_group).posts_count, 1)
+        self.assertFalse(GroupContributor.objects.filter(
+            group=self.group, author=self.users[0]).exists())
+
+    def test_group_delete_drops_stats(self):
+        """Удаление группы удаляет её сводку."""
+        group = Group.objects.create(title='Временная', slug='temp')
+        Post.objects.create(author=self.users[0], text='Пост', group=group)
+        group_id = group.pk
+        group.delete()
+        self.assertFalse(GroupStats.objects.filter(group_id=group_id).exists())
+        self.assertFalse(
+            GroupContributor.objects.filter(group_id=group_id).exists())
+
+    def test_directory_page(self):
+        """Каталог групп показывает сводку без агрегатов по постам."""
+        with self.assertNumQueries(3):
+            response = self.guest_client.get(reverse('posts:group_index'))
+        groups = list(response.context['page_obj'])
+        self.assertEqual(groups[0], self.group)
+        top = [c.author for c in groups[0].top_contributors]
+        self.assertEqual(top, self.users[:0:-1])
+        self.assertContains(response, 'Всего постов: 10')
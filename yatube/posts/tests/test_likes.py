@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..likes import liked_post_ids, likes_counts
+from ..models import Like, LikeCounter, Post
+
+User = get_user_model()
+
+
+class LikeTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f'Пост {index}')
+            for index in range(3)
+        ]
+        cls.post = cls.posts[0]
+        cls.like_url = reverse(
+            'posts:post_like', kwargs={'post_id': cls.post.pk})
+        cls.unlike_url = reverse(
+            'posts:post_unlike', kwargs={'post_id': cls.post.pk})
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+
+    def test_like_is_idempotent(self):
+        """Повторный лайк и повторная отмена ничего не меняют."""
+        for _ in range(2):
+            self.authorized_client.post(self.like_url)
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(likes_counts([self.post.pk])[self.post.pk], 1)
+        for _ in range(2):
+            self.authorized_client.post(self.unlike_url)
+        self.assertEqual(Like.objects.count(), 0)
+        self.assertEqual(likes_counts([self.post.pk])[self.post.pk], 0)
+
+    def test_like_requires_post(self):
+        """Лайк ставится только POST-запросом."""
+        response = self.authorized_client.get(self.like_url)
+        self.assertEqual(response.status_code, 405)
+
+    def test_aggregate_likes(self):
+        """Шарды счётчика сводятся в пост."""
+        users = [
+            User.objects.create_user(username=f'user_{index}')
+            for index in range(5)
+        ]
+        for user in users:
+            client = Client()
+            client.force_login(user)
+            client.post(self.like_url)
+        call_command('aggregate_likes', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 5)
+        self.assertFalse(LikeCounter.objects.exists())
+        self.assertEqual(likes_counts([self.post.pk])[self.post.pk], 5)
+
+    def test_liked_post_ids_one_query(self):
+        """Лайки всей страницы проверяются одним запросом."""
+        Like.objects.create(user=self.user, post=self.posts[1])
+        with self.assertNumQueries(1):
+            liked = liked_post_ids(
+                self.user, [post.pk for post in self.posts])
+        self.assertEqual(liked, {self.posts[1].pk})
+
+    def test_feed_shows_user_likes(self):
+        """В ленте видно, какие посты лайкнул пользователь."""
+        self.authorized_client.post(self.like_url)
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, self.unlike_url)
+        self.assertContains(response, 'btn-light', count=2)
+        response = Client().get(reverse('posts:index'))
+        self.assertNotContains(response, self.unlike_url)
+        self.assertNotContains(response, 'placeholder')
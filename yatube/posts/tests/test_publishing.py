@@ -0,0 +1,169 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import publishing, signals
+from ..models import Group, GroupStats, Post
+from ..publishing import next_due, publish_due
+
+User = get_user_model()
+
+
+class SchedulingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def create(self, **schedule):
+        data = {'text': 'Отложенный пост', 'group': self.group.pk}
+        data.update(
+            {f'schedule-{key}': value for key, value in schedule.items()})
+        return self.author_client.post(reverse('posts:post_create'), data)
+
+    def test_draft_hidden_from_feeds(self):
+        """Черновик виден только в черновиках автора."""
+        response = self.create(draft='on')
+        self.assertRedirects(response, reverse('posts:drafts'))
+        post = Post.objects.get()
+        self.assertFalse(post.is_published)
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'auth_author'}),
+        ):
+            self.assertNotContains(self.client.get(url), 'Отложенный пост')
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertEqual(response.status_code, 404)
+        response = self.author_client.get(reverse('posts:drafts'))
+        self.assertContains(response, 'Отложенный пост')
+        self.assertEqual(GroupStats.objects.get().posts_count, 0)
+
+    def test_past_time_rejected(self):
+        response = self.create(publish_at='2000-01-01 10:00')
+        self.assertFormError(
+            response, 'schedule_form', 'publish_at', 'Это время уже прошло')
+
+    def test_scheduler_publishes_due_posts(self):
+        """Планировщик публикует наступившие посты и обновляет ленты."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        self.create(publish_at=f'{publish_at:%Y-%m-%d %H:%M:%S}')
+        later = publish_at + timedelta(days=1)
+        self.create(publish_at=f'{later:%Y-%m-%d %H:%M:%S}')
+        group_url = reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        self.client.get(group_url)
+        self.assertEqual(publish_due(), 0)
+        self.assertEqual(
+            next_due().replace(microsecond=0),
+            publish_at.replace(microsecond=0))
+        published_at = publish_at + timedelta(minutes=1)
+        self.assertEqual(publish_due(published_at), 1)
+        post = Post.objects.published().get()
+        self.assertEqual(post.pub_date, published_at)
+        self.assertEqual(GroupStats.objects.get().posts_count, 1)
+        self.assertContains(self.client.get(group_url), 'Отложенный пост')
+
+    def test_scheduler_sends_post_save(self):
+        """Публикация идёт через save(): подписчики сигнала её видят."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        self.create(publish_at=f'{publish_at:%Y-%m-%d %H:%M:%S}')
+        receiver = mock.Mock()
+        post_save.connect(receiver, sender=Post)
+        self.addCleanup(post_save.disconnect, receiver, sender=Post)
+        publish_due(publish_at + timedelta(minutes=1))
+        receiver.assert_called_once()
+        instance = receiver.call_args[1]['instance']
+        self.assertTrue(instance.is_published)
+        self.assertEqual(
+            receiver.call_args[1]['update_fields'],
+            {'is_published', 'pub_date'})
+
+    def test_batch_fans_out_once(self):
+        """Пачка разносит посты по лентам и сбрасывает страницы один раз."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        for _ in range(3):
+            self.create(publish_at=f'{publish_at:%Y-%m-%d %H:%M:%S}')
+        announce = mock.Mock()
+        invalidate = mock.Mock()
+        with mock.patch.object(publishing, 'announce', announce), \
+                mock.patch.object(signals, 'invalidate_pages', invalidate), \
+                mock.patch.object(
+                    publishing, 'invalidate_pages', invalidate):
+            self.assertEqual(publish_due(publish_at), 3)
+        announce.assert_called_once()
+        self.assertEqual(
+            {post.pk for post in announce.call_args[0][0]},
+            set(Post.objects.values_list('pk', flat=True)))
+        invalidate.assert_called_once_with()
+        self.assertEqual(GroupStats.objects.get().posts_count, 3)
+
+    def test_batch_skips_old_values_query(self):
+        """Прежние значения поста не перечитываются на каждый save()."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        for _ in range(2):
+            self.create(publish_at=f'{publish_at:%Y-%m-%d %H:%M:%S}')
+        old_values = Post.objects.filter(pk=0).values_list(
+            'group_id', 'text', 'pub_date', 'is_published').query
+        columns = str(old_values).split(' FROM ')[0]
+        with CaptureQueriesContext(connection) as queries:
+            publish_due(publish_at)
+        self.assertFalse([
+            query['sql'] for query in queries
+            if query['sql'].startswith(columns)])
+
+    def test_author_previews_draft(self):
+        """Автор видит свой черновик, страница не попадает в общий кэш."""
+        self.create(draft='on')
+        url = reverse(
+            'posts:post_detail', kwargs={'post_id': Post.objects.get().pk})
+        response = self.author_client.get(url)
+        self.assertContains(response, 'Отложенный пост')
+        self.assertContains(response, 'его видите только вы')
+        self.assertIn('private', response['Cache-Control'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        other = Client()
+        other.force_login(User.objects.create_user(username='other'))
+        self.assertEqual(other.get(url).status_code, 404)
+
+    def test_next_due_uses_partial_index(self):
+        sql, params = Post.objects.filter(
+            is_published=False, publish_at__isnull=False,
+        ).order_by('publish_at').values('publish_at').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('post_publish_due', plan)
+
+    def test_publish_draft_from_edit(self):
+        """Черновик публикуется из формы редактирования."""
+        self.create(draft='on')
+        post = Post.objects.get()
+        response = self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': 'Готовый пост', 'group': self.group.pk},
+        )
+        self.assertRedirects(
+            response,
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        post.refresh_from_db()
+        self.assertTrue(post.is_published)
+        self.assertEqual(GroupStats.objects.get().posts_count, 1)
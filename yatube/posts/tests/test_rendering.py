@@ -0,0 +1,59 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import markup
+from ..models import Post
+
+User = get_user_model()
+
+
+class PostRenderingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_rendered_on_save(self):
+        post = Post.objects.create(author=self.author, text='**жирный**')
+        self.assertEqual(post.text_html, '<p><strong>жирный</strong></p>')
+        self.assertEqual(post.renderer_version, markup.RENDERER_VERSION)
+        post.text = '*курсив*'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><em>курсив</em></p>')
+
+    def test_rendered_with_update_fields(self):
+        """save(update_fields=['text']) записывает и готовый HTML."""
+        post = Post.objects.create(author=self.author, text='**жирный**')
+        post.text = '*курсив*'
+        post.save(update_fields=['text'])
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><em>курсив</em></p>')
+        self.assertEqual(post.renderer_version, markup.RENDERER_VERSION)
+
+    def test_page_shows_stored_html(self):
+        """Страница выводит сохранённый HTML, не отрисовывая Markdown."""
+        post = Post.objects.create(author=self.author, text='**жирный**')
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        with mock.patch.object(markup, 'render') as render:
+            response = Client().get(url)
+        render.assert_not_called()
+        self.assertContains(response, '<strong>жирный</strong>', html=True)
+
+    def test_rerender_command(self):
+        post = Post.objects.create(author=self.author, text='*курсив*')
+        Post.objects.filter(pk=post.pk).update(
+            text_html='', renderer_version=0)
+        call_command('rerender_posts', workers=2, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p><em>курсив</em></p>')
+        self.assertEqual(post.renderer_version, markup.RENDERER_VERSION)
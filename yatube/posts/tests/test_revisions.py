@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import revisions
+from ..models import Post, PostRevision
+from ..signals import bump_card_version
+
+User = get_user_model()
+
+
+class PostRevisionsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.post = Post.objects.create(
+            author=self.author, text='Первая версия текста поста')
+
+    def edit(self, text):
+        self.post.text = text
+        self.post.save()
+
+    def test_delta_round_trip(self):
+        """Дельта восстанавливает старый текст из нового."""
+        pairs = [
+            ('один два три', 'один три четыре'),
+            ('', 'текст'),
+            ('текст', ''),
+            ('строка\nвторая  строка\n', 'строка\nтретья строка'),
+        ]
+        for new, old in pairs:
+            with self.subTest(new=new, old=old):
+                delta = revisions.make_delta(new, old)
+                self.assertEqual(revisions.apply_delta(new, delta), old)
+
+    def test_edit_records_compact_revision(self):
+        """Правка текста сохраняет прежнюю версию дельтой."""
+        long_text = ' '.join(['слово'] * 200)
+        self.edit(long_text)
+        self.edit(long_text + ' и ещё одно')
+        revision = PostRevision.objects.get(post=self.post, number=2)
+        self.assertFalse(revision.snapshot)
+        self.assertLess(len(revision.data), 20)
+        self.assertEqual(revisions.text_at(self.post, 2), long_text)
+        self.assertEqual(
+            revisions.text_at(self.post, 1), 'Первая версия текста поста')
+
+    def test_same_text_not_recorded(self):
+        """Правка без текста не даёт ни ревизии, ни ссылки на историю."""
+        self.edit(self.post.text)
+        self.assertFalse(PostRevision.objects.exists())
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertNotContains(
+            response,
+            reverse('posts:post_history', kwargs={'post_id': self.post.pk}))
+
+    def test_numbering_ignores_card_version(self):
+        """Номера ревизий не зависят от версии карточки поста."""
+        self.edit(self.post.text)
+        bump_card_version(pk=self.post.pk)
+        self.edit('Вторая версия текста поста')
+        self.assertEqual(
+            list(self.post.revisions.values_list('number', flat=True)), [1])
+        self.assertEqual(
+            revisions.text_at(self.post, 1), 'Первая версия текста поста')
+        self.assertEqual(
+            revisions.text_at(self.post, 2), 'Вторая версия текста поста')
+
+    @mock.patch.object(revisions, 'SNAPSHOT_EVERY', 3)
+    @mock.patch.object(revisions, 'MAX_REVISIONS', 5)
+    def test_snapshots_and_bound(self):
+        """Снимки идут периодически, старые ревизии удаляются."""
+        for number in range(2, 10):
+            self.edit(f'Версия номер {number} текста поста')
+        numbers = list(self.post.revisions.order_by('number').values_list(
+            'number', 'snapshot'))
+        self.assertEqual(numbers, [
+            (4, False), (5, False), (6, True), (7, False), (8, False),
+        ])
+        for number in range(4, 10):
+            self.assertEqual(
+                revisions.text_at(self.post, number),
+                f'Версия номер {number} текста поста')
+
+    def test_history_page(self):
+        """Страница истории показывает все версии."""
+        self.edit('Вторая версия текста поста')
+        response = self.client.get(
+            reverse('posts:post_history', kwargs={'post_id': self.post.pk}))
+        versions = response.context['versions']
+        self.assertEqual([number for number, _, _ in versions], [2, 1])
+        self.assertContains(response, 'Первая версия текста поста')
+        self.assertIn('-Первая версия', versions[0][2])
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}))
+        self.assertContains(
+            response,
+            reverse('posts:post_history', kwargs={'post_id': self.post.pk}))
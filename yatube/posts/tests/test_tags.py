@@ -0,0 +1,148 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import tags
+from ..models import Mention, Post, PostTag
+from ..tags import extract_mentions, extract_tags
+
+User = get_user_model()
+
+
+class TagsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.reader = User.objects.create_user(username='reader.one')
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def post_tags(self, post):
+        return set(PostTag.objects.filter(post=post).values_list(
+            'tag__name', flat=True))
+
+    def test_extract(self):
+        text = ('#Django и #django, https://x.ru/#anchor, a#b, &#39; '
+                '@reader.one. mail@example.com (@auth_author)')
+        self.assertEqual(extract_tags(text), {'django'})
+        self.assertEqual(
+            extract_tags('#' + 'а' * 50 + ' #' + 'б' * 51), {'а' * 50})
+        self.assertEqual(
+            extract_mentions(text), {'reader.one', 'auth_author'})
+
+    def test_edit_touches_only_changed_tags(self):
+        """Правка удаляет и добавляет только изменившиеся теги."""
+        post = Post.objects.create(author=self.author, text='#a #b')
+        kept = PostTag.objects.get(post=post, tag__name='a')
+        self.author_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            {'text': '#a #c'},
+        )
+        self.assertEqual(self.post_tags(post), {'a', 'c'})
+        self.assertTrue(PostTag.objects.filter(pk=kept.pk).exists())
+
+    def test_tag_page_cursor(self):
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {n} #Тег')
+            for n in range(3)
+        ]
+        Post.objects.create(author=self.author, text='Без тегов')
+        url = reverse('posts:tag', kwargs={'name': 'тег'})
+        with mock.patch.object(tags, 'TAG_PAGE_SIZE', 2):
+            first, cursor = tags.tag_page(posts[0].post_tags.get().tag)
+            self.assertEqual(first, posts[:0:-1])
+            self.assertEqual(cursor, tags.make_cursor(posts[1]))
+            response = self.client.get(url, {'before': cursor})
+        self.assertEqual(response.context['posts'], [posts[0]])
+        self.assertIsNone(response.context['cursor'])
+        self.assertEqual(self.client.get(
+            reverse('posts:tag', kwargs={'name': 'нет'})).status_code, 404)
+        response = self.client.get(url, {'before': 'испорчен'})
+        self.assertEqual(response.context['posts'], posts[::-1])
+
+    def test_tag_page_follows_pub_date(self):
+        """Черновик встаёт в ленту тега по дате публикации, не по id."""
+        draft = Post.objects.create(
+            author=self.author, text='Черновик #тег', is_published=False)
+        older = Post.objects.create(author=self.author, text='Пост #тег')
+        same = Post.objects.create(author=self.author, text='Ещё #тег')
+        Post.objects.filter(pk=same.pk).update(pub_date=older.pub_date)
+        PostTag.objects.filter(post=same).update(pub_date=older.pub_date)
+        draft.is_published = True
+        draft.pub_date = timezone.now()
+        draft.save()
+        tag = draft.post_tags.get().tag
+        walked, cursor = [], None
+        with mock.patch.object(tags, 'TAG_PAGE_SIZE', 1):
+            while True:
+                page, cursor = tags.tag_page(tag, tags.parse_cursor(cursor))
+                walked += page
+                if cursor is None:
+                    break
+        self.assertEqual(walked, [draft, same, older])
+
+    def test_tag_page_walks_index(self):
+        """Страница тега читается по индексу (tag, pub_date, post)."""
+        post = Post.objects.create(author=self.author, text='#тег')
+        tag = post.post_tags.get().tag
+        with CaptureQueriesContext(connection) as queries:
+            tags.tag_page(tag, before=(post.pub_date, post.pk + 1))
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {queries[0]["sql"]}')
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+        self.assertIn('USING COVERING INDEX post_tag_feed', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_mentions_notify_once(self):
+        """Упомянутый получает уведомление один раз, даже после правки."""
+        post = Post.objects.create(
+            author=self.author, text='Привет, @reader.one и @nobody')
+        self.assertEqual(tags.unseen_mentions(self.reader), 1)
+        post.text = 'Привет ещё раз, @reader.one'
+        post.save()
+        self.assertEqual(Mention.objects.count(), 1)
+        response = self.reader_client.get(reverse('posts:mentions'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertEqual(tags.unseen_mentions(self.reader), 0)
+        post.text = 'Без упоминаний'
+        post.save()
+        self.assertFalse(Mention.objects.exists())
+
+    def test_drafts_do_not_notify(self):
+        Post.objects.create(
+            author=self.author, text='@reader.one', is_published=False)
+        self.assertEqual(tags.unseen_mentions(self.reader), 0)
+
+    def test_mentions_ordered_by_pub_date(self):
+        """Опубликованный позже черновик в упоминаниях идёт первым."""
+        draft = Post.objects.create(
+            author=self.author, text='Черновик @reader.one',
+            is_published=False)
+        post = Post.objects.create(author=self.author, text='@reader.one')
+        draft.is_published = True
+        draft.pub_date = timezone.now()
+        draft.save()
+        response = self.reader_client.get(reverse('posts:mentions'))
+        self.assertEqual(list(response.context['page_obj']), [draft, post])
+
+    def test_index_command(self):
+        post = Post.objects.create(author=self.author, text='#a @reader.one')
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        call_command('index_tags', stdout=StringIO())
+        self.assertEqual(self.post_tags(post), {'a'})
+        self.assertTrue(Mention.objects.get().seen)
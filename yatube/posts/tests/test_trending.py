@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..models import Comment, Post, PostRank
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.quiet_post = Post.objects.create(
+            author=cls.user, text='Тихий пост')
+        cls.hot_post = Post.objects.create(
+            author=cls.user, text='Горячий пост')
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_comment_raises_rank(self):
+        """Комментарий поднимает пост в «Популярном»."""
+        Comment.objects.create(
+            post=self.quiet_post, author=self.user, text='Комментарий')
+        response = self.guest_client.get(reverse('posts:trending'))
+        page = list(response.context['page_obj'])
+        self.assertEqual(page, [self.quiet_post, self.hot_post])
+
+    def test_old_activity_decays(self):
+        """Старая активность весит меньше свежей."""
+        old = timezone.now() - timedelta(seconds=trending.HALF_LIFE * 3)
+        for _ in range(4):
+            trending.record_activity(self.quiet_post.pk, 'comment', old)
+        trending.record_activity(self.hot_post.pk, 'comment')
+        ranks = PostRank.objects.order_by('-score')
+        self.assertEqual(ranks[0].post_id, self.hot_post.pk)
+
+    def test_decay_pass_prunes(self):
+        """Затухшие посты убираются из рейтинга."""
+        later = timezone.now() + timedelta(seconds=trending.HALF_LIFE * 10)
+        trending.record_activity(self.hot_post.pk, 'comment', later)
+        self.assertEqual(trending.decay_pass(later), 1)
+        self.assertEqual(
+            list(PostRank.objects.values_list('post_id', flat=True)),
+            [self.hot_post.pk])
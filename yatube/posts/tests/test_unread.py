@@ -0,0 +1,86 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import unread
+from ..graph import reset_follow_graph
+from ..models import Follow, Post
+from ..publishing import publish_due
+
+User = get_user_model()
+
+
+class UnreadCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.user, author=cls.author)
+        cls.unread_url = reverse('posts:follow_unread')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+        reset_follow_graph()
+
+    def test_unread_counts_followed_authors(self):
+        """Счётчик видит только новые посты авторов из подписок."""
+        Post.objects.create(author=self.author, text='Первый')
+        Post.objects.create(author=self.stranger, text='Чужой')
+        response = self.authorized_client.get(self.unread_url)
+        self.assertEqual(response.json(), {'count': 1, 'label': '1'})
+        self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread.unread_count(self.user), 0)
+
+    def test_new_post_invalidates_cached_count(self):
+        """Новый пост автора сбрасывает закэшированный счётчик."""
+        self.assertEqual(unread.unread_count(self.user), 0)
+        with self.assertNumQueries(0):
+            unread.unread_count(self.user)
+        Post.objects.create(author=self.author, text='Свежий')
+        self.assertEqual(unread.unread_count(self.user), 1)
+
+    @mock.patch.object(unread, 'UNREAD_LIMIT', 2)
+    def test_count_is_capped(self):
+        """Больше предела не считаем."""
+        for number in range(5):
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+        response = self.authorized_client.get(self.unread_url)
+        self.assertEqual(response.json(), {'count': 3, 'label': '2+'})
+
+    def test_mark_seen_writes_only_forward(self):
+        """Отметка пишется, только если сдвигается вперёд."""
+        now = timezone.now()
+        unread.mark_seen(self.user, now - timedelta(hours=1))
+        unread.mark_seen(self.user, now)
+        self.assertEqual(unread.last_seen(self.user), now)
+        for seen_at in (now, now - timedelta(days=1)):
+            with CaptureQueriesContext(connection) as queries:
+                unread.mark_seen(self.user, seen_at)
+            self.assertEqual(
+                [query['sql'].split()[0] for query in queries], ['SELECT'])
+        self.assertEqual(unread.last_seen(self.user), now)
+
+    def test_scheduled_post_counted_after_newer_seen(self):
+        """Отложенный пост непрочитан, даже если новее него уже видели."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        Post.objects.create(
+            author=self.author, text='Отложенный',
+            is_published=False, publish_at=publish_at)
+        Post.objects.create(author=self.author, text='Свежий')
+        self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread.unread_count(self.user), 0)
+        publish_due(publish_at + timedelta(minutes=1))
+        self.assertEqual(unread.unread_count(self.user), 1)
+        self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(unread.unread_count(self.user), 0)
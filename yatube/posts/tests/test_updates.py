@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import updates
+from ..graph import reset_follow_graph
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+@mock.patch.object(updates, 'POLL_INTERVAL', 0)
+class FeedUpdatesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth_user')
+        cls.author = User.objects.create_user(username='auth_author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        cache.clear()
+        reset_follow_graph()
+
+    def open_stream(self, client, **params):
+        response = client.get(reverse('posts:feed_updates'), params)
+        self.addCleanup(response.close)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = iter(response.streaming_content)
+        self.assertTrue(next(events).startswith(b'retry:'))
+        return events
+
+    def test_new_posts_counted_per_feed(self):
+        """Каждая лента считает только свои новые посты."""
+        index = self.open_stream(self.client)
+        group = self.open_stream(
+            self.client, feed='group', group=self.group.pk)
+        follow = self.open_stream(self.authorized_client, feed='follow')
+        for events in (index, group, follow):
+            self.assertEqual(next(events), b': ping\n\n')
+        Post.objects.create(author=self.author, text='Подписка')
+        Post.objects.create(author=self.user, text='Группа', group=self.group)
+        self.assertIn(b'data: {"new": 2}', next(index))
+        self.assertIn(b'data: {"new": 1}', next(group))
+        self.assertIn(b'data: {"new": 1}', next(follow))
+        self.assertEqual(next(index), b': ping\n\n')
+
+    def test_reconnect_keeps_baseline(self):
+        """После переподключения счёт идёт с открытия страницы."""
+        Post.objects.create(author=self.author, text='Старый пост')
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.client.get(
+            reverse('posts:feed_updates'), HTTP_LAST_EVENT_ID='1')
+        self.addCleanup(response.close)
+        events = iter(response.streaming_content)
+        next(events)
+        self.assertEqual(next(events), b'id: 1\ndata: {"new": 1}\n\n')
+
+    def test_stream_starts_from_page_watermark(self):
+        """Посты между отрисовкой страницы и подключением учитываются."""
+        Post.objects.create(author=self.author, text='Старый пост')
+        page = self.client.get(reverse('posts:index'))
+        self.assertContains(page, '&since=1')
+        Post.objects.create(author=self.author, text='Новый пост')
+        events = self.open_stream(self.client, feed='index', since=1)
+        self.assertEqual(next(events), b'id: 1\ndata: {"new": 1}\n\n')
+
+    @mock.patch.object(updates, 'streams', updates.threading.Semaphore(1))
+    def test_connections_bounded(self):
+        """Лишнее соединение получает 503, закрытое освобождает слот."""
+        first = self.client.get(reverse('posts:feed_updates'))
+        response = self.client.get(reverse('posts:feed_updates'))
+        self.assertEqual(response.status_code, 503)
+        first.close()
+        response = self.client.get(reverse('posts:feed_updates'))
+        self.addCleanup(response.close)
+        self.assertEqual(response.status_code, 200)
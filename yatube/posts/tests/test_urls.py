@@ -1,6 +1,7 @@
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 
 from ..models import Group, Post
@@ -47,6 +48,7 @@ class StaticURLTests(TestCase):
         self.author_client.force_login(self.author)
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
+        cache.clear()
 
     def test_public_urls_work(self):
         """Проверяем url доступные любому пользователю."""
@@ -0,0 +1,82 @@
+import math
+import random
+from datetime import datetime
+from functools import wraps
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Post, PostRank
+
+# Вес активности уменьшается вдвое за это время.
+HALF_LIFE: int = 60 * 60 * 12
+EPOCH = datetime(2022, 1, 1)
+WEIGHTS = {
+    'post': 1.0,
+    'comment': 2.0,
+    'like': 1.0,
+    'view': 0.1,
+}
+# Записываем в рейтинг один просмотр из стольких, но с таким же весом.
+VIEW_SAMPLE_RATE: int = 10
+# Посты, рейтинг которых затух ниже этого веса, убираются из таблицы.
+MIN_WEIGHT: float = 0.05
+
+
+def _log_weight(weight, when):
+    if timezone.is_aware(when):
+        when = timezone.make_naive(when)
+    return math.log2(weight) + (when - EPOCH).total_seconds() / HALF_LIFE
+
+
+def _log_add(first, second):
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def record_activity(post_id, kind, when=None, weight=None):
+    """Добавляет активность к рейтингу поста."""
+    if weight is None:
+        weight = WEIGHTS[kind]
+    value = _log_weight(weight, when or timezone.now())
+    with transaction.atomic():
+        rank = PostRank.objects.select_for_update().filter(
+            post_id=post_id).first()
+        if rank is not None:
+            rank.score = _log_add(rank.score, value)
+            rank.save(update_fields=['score'])
+            return
+        try:
+            with transaction.atomic():
+                PostRank.objects.create(post_id=post_id, score=value)
+        except IntegrityError:
+            # Строку рейтинга создали параллельно.
+            rank = PostRank.objects.select_for_update().get(post_id=post_id)
+            rank.score = _log_add(rank.score, value)
+            rank.save(update_fields=['score'])
+
+
+def decay_pass(now=None):
+    """Убирает из рейтинга посты, активность которых затухла.
+
+    Сами значения пересчитывать не нужно: затухание уже заложено
+    в сравнение с текущим порогом. Возвращает число удалённых строк.
+    """
+    threshold = _log_weight(MIN_WEIGHT, now or timezone.now())
+    deleted, _ = PostRank.objects.filter(score__lt=threshold).delete()
+    return deleted
+
+
+def count_views(view):
+    """Учитывает просмотры страницы поста в рейтинге выборочно."""
+    @wraps(view)
+    def wrapper(request, post_id, *args, **kwargs):
+        response = view(request, post_id, *args, **kwargs)
+        # Архивные посты и предпросмотр черновиков в рейтинг не попадают.
+        if (request.method == 'GET' and response.status_code == 200
+                and random.randrange(VIEW_SAMPLE_RATE) == 0
+                and Post.objects.published().filter(pk=post_id).exists()):
+            record_activity(
+                post_id, 'view', weight=WEIGHTS['view'] * VIEW_SAMPLE_RATE)
+        return response
+    return wrapper
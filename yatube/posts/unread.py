@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.db.models import Q
+
+from .graph import get_follow_graph
+from .models import FeedMarker, Post
+
+UNREAD_KEY = 'posts:unread:{}'
+UNREAD_TIMEOUT: int = 60
+# Больше этого не считаем: показываем «99+».
+UNREAD_LIMIT: int = 99
+
+
+def last_seen(user):
+    return FeedMarker.objects.filter(user=user).values_list(
+        'last_seen', flat=True).first()
+
+
+def mark_seen(user, seen_at):
+    """Сдвигает отметку прочтения ленты подписок вперёд.
+
+    Повторный просмотр той же ленты ничего не пишет: UPDATE даже
+    без подходящих строк берёт блокировку записи в SQLite.
+    """
+    marker = FeedMarker.objects.filter(user=user)
+    current = marker.values_list('last_seen').first()
+    if current is None:
+        FeedMarker.objects.bulk_create(
+            [FeedMarker(user=user)], ignore_conflicts=True)
+    elif current[0] is not None and current[0] >= seen_at:
+        return
+    # Условие в UPDATE: параллельный запрос мог уйти дальше.
+    marker.filter(
+        Q(last_seen__isnull=True) | Q(last_seen__lt=seen_at),
+    ).update(last_seen=seen_at)
+    forget(user.pk)
+
+
+def unread_count(user):
+    """Сколько непрочитанных постов от авторов из подписок.
+
+    Считает не больше UNREAD_LIMIT + 1 строк по индексу
+    (author, pub_date) и держит результат в кэше, пока авторы
+    не опубликуют новый пост.
+    """
+    key = UNREAD_KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        posts = Post.objects.published().filter(
+            author_id__in=get_follow_graph().following(user.pk))
+        seen_at = last_seen(user)
+        if seen_at is not None:
+            posts = posts.filter(pub_date__gt=seen_at)
+        count = posts.order_by().values('pk')[:UNREAD_LIMIT + 1].count()
+        cache.set(key, count, UNREAD_TIMEOUT)
+    return count
+
+
+def unread_label(count):
+    return f'{UNREAD_LIMIT}+' if count > UNREAD_LIMIT else str(count)
+
+
+def forget(user_id):
+    cache.delete(UNREAD_KEY.format(user_id))
+
+
+def posts_published(posts):
+    """Сбрасывает счётчики подписчиков авторов одним запросом к кэшу."""
+    follow_graph = get_follow_graph()
+    followers = set()
+    for author_id in {post.author_id for post in posts}:
+        followers |= follow_graph.followers(author_id)
+    cache.delete_many([UNREAD_KEY.format(user_id) for user_id in followers])
@@ -0,0 +1,115 @@
+import json
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+from .graph import get_follow_graph
+
+WATERMARK_KEY = 'posts:updates:{}'
+# Как часто поток сверяется с кэшем, секунд.
+POLL_INTERVAL: int = 5
+# Сколько живёт одно соединение; потом браузер переподключается сам.
+STREAM_DURATION: int = 60
+# Через сколько миллисекунд браузеру переподключаться.
+RECONNECT_DELAY: int = 5000
+# Сколько потоков держит один процесс.
+MAX_STREAMS: int = 50
+
+streams = threading.BoundedSemaphore(MAX_STREAMS)
+
+
+def post_scopes(post):
+    """Ленты, в которых появляется пост."""
+    scopes = ['index', f'author:{post.author_id}']
+    if post.group_id:
+        scopes.append(f'group:{post.group_id}')
+    return scopes
+
+
+def record_posts(posts):
+    """Сдвигает счётчики новых постов в лентах постов."""
+    scopes = Counter(
+        scope for post in posts for scope in post_scopes(post))
+    for scope, count in scopes.items():
+        key = WATERMARK_KEY.format(scope)
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            cache.set(key, count, None)
+
+
+def watermark(scopes):
+    """Сколько всего постов вышло в лентах — одним запросом к кэшу."""
+    keys = [WATERMARK_KEY.format(scope) for scope in scopes]
+    return sum(cache.get_many(keys).values())
+
+
+def scopes_for(user, feed, group_id=''):
+    """Ленты, которые показывает страница: feed — index|group|follow."""
+    group_id = str(group_id)
+    if feed == 'group' and group_id.isdigit():
+        return lambda: [f'group:{group_id}']
+    if feed == 'follow' and user.is_authenticated:
+        user_id = user.pk
+        return lambda: [
+            f'author:{author_id}'
+            for author_id in get_follow_graph().following(user_id)
+        ]
+    return lambda: ['index']
+
+
+def feed_scopes(request):
+    """Ленты, за которыми следит клиент: ?feed=index|group|follow."""
+    return scopes_for(
+        request.user,
+        request.GET.get('feed', 'index'),
+        request.GET.get('group', ''),
+    )
+
+
+def parse_since(value):
+    """Точка отсчёта из Last-Event-ID или ?since=; None — с подключения."""
+    return int(value) if value and value.isdigit() else None
+
+
+class EventStream:
+    """События «N новых постов» с момента since.
+
+    Без since отсчёт идёт с подключения.
+
+    Держит слот семафора streams, пока сервер не закроет ответ.
+    """
+
+    def __init__(self, scopes, since=None):
+        self.scopes = scopes
+        self.since = since
+        self.closed = False
+
+    def __iter__(self):
+        baseline = (
+            watermark(self.scopes()) if self.since is None else self.since)
+        yield f'retry: {RECONNECT_DELAY}\n\n'
+        deadline = time.monotonic() + STREAM_DURATION
+        sent = baseline
+        while time.monotonic() < deadline:
+            current = watermark(self.scopes())
+            if current < baseline:
+                # Счётчики вытеснены из кэша — считаем с нуля.
+                baseline = sent = current
+            if current != sent:
+                sent = current
+                data = json.dumps({'new': current - baseline})
+                # В id — точка отсчёта: после переподключения
+                # счёт продолжится с момента открытия страницы.
+                yield f'id: {baseline}\ndata: {data}\n\n'
+            else:
+                yield ': ping\n\n'
+            time.sleep(POLL_INTERVAL)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            streams.release()
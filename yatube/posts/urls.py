@@ -8,17 +8,37 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.trending, name='trending'),
+    path('groups/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('tags/<str:name>/', views.tag_posts, name='tag'),
+    path('mentions/', views.mentions, name='mentions'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
+    path('drafts/', views.drafts, name='drafts'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path(
+        'posts/<int:post_id>/history/',
+        views.post_history,
+        name='post_history'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path(
+        'posts/<int:post_id>/unlike/',
+        views.post_unlike,
+        name='post_unlike'
+    ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/unread/', views.follow_unread, name='follow_unread'),
+    path('updates/', views.feed_updates, name='feed_updates'),
+    path('follow/many/', views.follow_many, name='follow_many'),
+    path('unfollow/many/', views.unfollow_many, name='unfollow_many'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -1,17 +1,36 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import (
+    Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import render, get_object_or_404, redirect
+from django.utils.cache import patch_cache_control
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
 
-from .models import Post, Group, User, Follow
-from .forms import PostForm, CommentForm
+from core.composition import compose_page, with_placeholders
+from core.ratelimit import ratelimit
+from core.routers import use_replica
+
+from . import (
+    cached, follows, likes, revisions, tags, unread, updates
+)
+from .archive import ChainedPosts
+from .graph import get_follow_graph
+from .stats import top_contributors
+from .trending import count_views
+from .models import ArchivedPost, Post, Group, Follow, Mention, Tag
+from .forms import PostForm, CommentForm, ScheduleForm
 
 POST_COUNT: int = 10
 
 
+@compose_page
+@use_replica
 def index(request):
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
-    posts = Post.objects.all()
+    posts = Post.objects.published().select_related('author', 'group')
     paginator = Paginator(posts, POST_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -23,11 +42,31 @@ def index(request):
     return render(request, template, context)
 
 
+@compose_page
+@use_replica
+def trending(request):
+    template = 'posts/trending.html'
+    title = 'Популярное'
+    posts = Post.objects.published().filter(
+        rank__isnull=False).select_related(
+        'author', 'group').order_by('-rank__score')
+    paginator = Paginator(posts, POST_COUNT)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'title': title,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@compose_page
+@use_replica
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     title = 'Записи сообщества'
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = cached.groups.get_or_404(slug=slug)
+    posts = group.posts.published().select_related('author', 'group')
     paginator = Paginator(posts, POST_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -40,19 +79,62 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@compose_page
+@use_replica
+def tag_posts(request, name):
+    template = 'posts/tag.html'
+    tag = get_object_or_404(Tag, name=name.lower())
+    # Курсор вместо номера страницы: глубокие страницы не дороже первой.
+    posts, cursor = tags.tag_page(
+        tag, tags.parse_cursor(request.GET.get('before')))
+    context = {
+        'title': str(tag),
+        'tag': tag,
+        'posts': posts,
+        'cursor': cursor,
+    }
+    return render(request, template, context)
+
+
+@compose_page
+@use_replica
+def group_index(request):
+    template = 'posts/groups.html'
+    title = 'Группы'
+    groups = Group.objects.select_related('stats').order_by(
+        '-stats__last_activity', 'title')
+    paginator = Paginator(groups, POST_COUNT)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    contributors = top_contributors([group.pk for group in page_obj])
+    for group in page_obj:
+        group.top_contributors = contributors.get(group.pk, [])
+    context = {
+        'title': title,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@compose_page
+@use_replica
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.select_related('author', 'group')
+    author = cached.users.get_or_404(username=username)
+    # Мягко удалённых пользователей уже не показываем.
+    if not author.is_active:
+        raise Http404
+    posts = ChainedPosts(
+        author.posts.published().select_related('author', 'group'),
+        author.archived_posts.select_related('author', 'group'),
+    )
     count_author_posts = posts.count()
     paginator = Paginator(posts, POST_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    follow_count = author.follower.all().count()
-    followers_count = author.following.all().count()
-    following = (
-        request.user.is_authenticated
-        and author.following.filter(user=request.user).exists())
+    follow_graph = get_follow_graph()
+    follow_count = follow_graph.following_count(author.pk)
+    followers_count = follow_graph.followers_count(author.pk)
     context = {
         'author': author,
         'posts': posts,
@@ -60,46 +142,92 @@ def profile(request, username):
         'page_obj': page_obj,
         'follow_count': follow_count,
         'followers_count': followers_count,
-        'following': following,
     }
     return render(request, template, context)
 
 
+@count_views
+@compose_page
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = cached.posts.get(post_id)
+    # Неопубликованный пост автор смотрит как предпросмотр.
+    preview = post is not None and not post.is_published
+    if preview and request.user.pk != post.author_id:
+        raise Http404
+    # Старые посты переехали в архив и доступны только для чтения.
+    archived = post is None
+    if archived:
+        post = get_object_or_404(ArchivedPost, pk=post_id)
     author = post.author
-    count_author_posts = author.posts.count()
-    form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    # Мягко удалённых пользователей уже не показываем.
+    if not author.is_active:
+        raise Http404
+    count_author_posts = (
+        author.posts.published().count()
+        + author.archived_posts.count())
+    comments = post.comments.filter(
+        author__is_active=True).select_related('author')
+    # Форму выводит «дырка» add_comment.html. Здесь — пустая форма
+    # для контекста страницы: тело общее, POST к нему не привязываем.
+    form = CommentForm()
+    post_tags = [] if archived else Tag.objects.filter(post_tags__post=post)
     context = {
         'post': post,
         'author': author,
         'count_author_posts': count_author_posts,
         'form': form,
         'comments': comments,
+        'archived': archived,
+        'preview': preview,
+        'has_history': not archived and post.revisions.exists(),
+        'tags': post_tags,
+    }
+    response = render(request, template, context)
+    if preview:
+        patch_cache_control(response, private=True)
+    return response
+
+
+def post_history(request, post_id):
+    template = 'posts/post_history.html'
+    post = get_object_or_404(
+        Post.objects.published().select_related('author'), pk=post_id)
+    context = {
+        'post': post,
+        'versions': revisions.history(post),
     }
     return render(request, template, context)
 
 
+@ratelimit('post_create', user='5/m', ip='30/m')
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
     form = PostForm(
         request.POST or None,
         files=request.FILES or None)
-    if form.is_valid():
+    schedule_form = ScheduleForm(request.POST or None, prefix='schedule')
+    if form.is_valid() and schedule_form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
+        schedule_form.apply(post)
         post.save()
+        if not post.is_published:
+            return redirect('posts:drafts')
         return redirect('posts:profile', username=request.user.username)
-    return render(request, template, {'form': form})
+    context = {
+        'form': form,
+        'schedule_form': schedule_form,
+    }
+    return render(request, template, context)
 
 
+@ratelimit('post_edit', user='10/m', ip='60/m')
 @login_required
 def post_edit(request, post_id):
     template = 'posts/create_post.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = cached.posts.get_or_404(post_id)
     # Только автор может редактировать пост.
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
@@ -107,20 +235,53 @@ def post_edit(request, post_id):
         request.POST or None,
         files=request.FILES or None,
         instance=post)
-    if form.is_valid():
-        form.save()
+    # Опубликованный пост обратно в черновики не уходит.
+    schedule_form = None
+    if not post.is_published:
+        schedule_form = ScheduleForm(
+            request.POST or None, prefix='schedule', initial={
+                'draft': post.publish_at is None,
+                'publish_at': post.publish_at,
+            })
+    if form.is_valid() and (schedule_form is None or schedule_form.is_valid()):
+        post = form.save(commit=False)
+        if schedule_form is not None:
+            schedule_form.apply(post)
+        post.save()
+        if not post.is_published:
+            return redirect('posts:drafts')
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
         'form': form,
+        'schedule_form': schedule_form,
         'is_edit': True,
     }
     return render(request, template, context)
 
 
+@login_required
+def drafts(request):
+    # Черновики и отложенные посты автора
+    template = 'posts/drafts.html'
+    posts = request.user.posts.filter(is_published=False).order_by(
+        'publish_at', '-pub_date')
+    paginator = Paginator(posts, POST_COUNT)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'title': 'Черновики',
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@ratelimit('add_comment', user='10/m', ip='60/m')
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = cached.posts.get(post_id)
+    if post is None or not post.is_published:
+        raise Http404
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -130,17 +291,48 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@ratelimit('like', user='30/m', ip='120/m')
 @login_required
+@require_POST
+def post_like(request, post_id):
+    post = get_object_or_404(Post.objects.published(), pk=post_id)
+    likes.like(request.user, post)
+    return redirect_back(request, 'posts:post_detail', post_id=post.pk)
+
+
+@ratelimit('like', user='30/m', ip='120/m')
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    post = get_object_or_404(Post.objects.published(), pk=post_id)
+    likes.unlike(request.user, post)
+    return redirect_back(request, 'posts:post_detail', post_id=post.pk)
+
+
+def redirect_back(request, *args, **kwargs):
+    # Возвращаем на страницу, с которой пришла форма.
+    url = request.POST.get('next')
+    if is_safe_url(url, allowed_hosts={request.get_host()}):
+        return redirect(url)
+    return redirect(*args, **kwargs)
+
+
+@login_required
+@with_placeholders
+@use_replica
 def follow_index(request):
     # Страница постов "Избранные авторы"
     template = 'posts/follow.html'
     title = 'Избранные авторы'
-    posts = Post.objects.filter(
+    posts = Post.objects.published().filter(
         author__following__user=request.user
-    )
+    ).select_related('author', 'group')
     paginator = Paginator(posts, POST_COUNT)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    if page_obj.number == 1 and page_obj:
+        unread.mark_seen(
+            request.user, max(post.pub_date for post in page_obj))
     context = {
         'title': title,
         'page_obj': page_obj,
@@ -149,10 +341,60 @@ def follow_index(request):
     return render(request, template, context)
 
 
+@login_required
+def mentions(request):
+    # Посты, где упомянут пользователь; просмотренные гасят счётчик.
+    template = 'posts/mentions.html'
+    posts = Post.objects.published().filter(
+        mentions__user=request.user
+    ).select_related('author', 'group').order_by('-pub_date', '-pk')
+    paginator = Paginator(posts, POST_COUNT)
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    Mention.objects.filter(
+        user=request.user, seen=False,
+        post_id__in=[post.pk for post in page_obj],
+    ).update(seen=True)
+    context = {
+        'title': 'Упоминания',
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@login_required
+def follow_unread(request):
+    # Сколько непрочитанных постов в ленте подписок
+    count = unread.unread_count(request.user)
+    return JsonResponse({
+        'count': count,
+        'label': unread.unread_label(count),
+    })
+
+
+def feed_updates(request):
+    # Поток Server-Sent Events о новых постах в ленте
+    if not updates.streams.acquire(blocking=False):
+        response = HttpResponse(status=503)
+        response['Retry-After'] = str(updates.POLL_INTERVAL)
+        return response
+    # Точка отсчёта: id последнего события после переподключения,
+    # иначе watermark, с которым страница была отрисована.
+    since = updates.parse_since(
+        request.META.get('HTTP_LAST_EVENT_ID')
+        or request.GET.get('since'))
+    stream = updates.EventStream(updates.feed_scopes(request), since)
+    response = StreamingHttpResponse(
+        stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+@ratelimit('follow', user='30/m', ip='120/m', methods=('GET', 'POST'))
 @login_required
 def profile_follow(request, username):
     # Подписаться на автора
-    author = get_object_or_404(User, username=username)
+    author = cached.users.get_or_404(username=username)
     if author != request.user:
         Follow.objects.get_or_create(
             user=request.user, author=author
@@ -160,10 +402,28 @@ def profile_follow(request, username):
     return redirect('posts:profile', username=username)
 
 
+@ratelimit('follow', user='30/m', ip='120/m')
+@login_required
+@require_POST
+def follow_many(request):
+    # Подписка на нескольких авторов сразу, например при знакомстве
+    follows.bulk_follow(request.user, request.POST.getlist('author'))
+    return redirect_back(request, 'posts:follow_index')
+
+
+@ratelimit('follow', user='30/m', ip='120/m')
+@login_required
+@require_POST
+def unfollow_many(request):
+    follows.bulk_unfollow(request.user, request.POST.getlist('author'))
+    return redirect_back(request, 'posts:follow_index')
+
+
+@ratelimit('follow', user='30/m', ip='120/m', methods=('GET', 'POST'))
 @login_required
 def profile_unfollow(request, username):
     # Дизлайк, отписка
-    author = get_object_or_404(User, username=username)
+    author = cached.users.get_or_404(username=username)
     Follow.objects.filter(
         user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
@@ -0,0 +1,35 @@
+from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
+
+from .models import User, UserDeletion
+from .purge import soft_delete
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    """Удаление из админки только отключает пользователя.
+
+    Его содержимое потом пачками удаляет команда purge_users,
+    поэтому страница подтверждения не собирает все связанные строки.
+    """
+
+    def get_deleted_objects(self, objs, request):
+        return [str(obj) for obj in objs], {}, set(), []
+
+    def delete_model(self, request, obj):
+        soft_delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            soft_delete(user)
+
+
+class UserDeletionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'requested', 'purged')
+    raw_id_fields = ('user',)
+    readonly_fields = ('requested', 'purged')
+
+
+# Регистрация django.contrib.auth уже выполнена импортом UserAdmin.
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
+admin.site.register(UserDeletion, UserDeletionAdmin)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from users.models import UserDeletion
+from users.purge import PURGE_BATCH_SIZE, purge_user
+
+
+class Command(BaseCommand):
+    help = 'Пачками удаляет содержимое мягко удалённых пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=PURGE_BATCH_SIZE,
+            help='Строк в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        deletions = UserDeletion.objects.select_related('user')
+        for deletion in deletions:
+            username = deletion.user.username
+            for stage, deleted in purge_user(
+                    deletion, options['batch_size']):
+                self.stdout.write(
+                    f'{username}: {stage} −{deleted}, '
+                    f'всего {deletion.purged}')
+            self.stdout.write(f'{username}: удалён')
@@ -0,0 +1,29 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:16
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDeletion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='deletion', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('requested', models.DateTimeField(auto_now_add=True, verbose_name='Запрошено')),
+                ('purged', models.PositiveIntegerField(default=0, verbose_name='Удалено строк')),
+            ],
+            options={
+                'verbose_name': 'Удаление пользователя',
+                'verbose_name_plural': 'Удаления пользователей',
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class UserDeletion(models.Model):
+    """Пользователь удалён мягко и ждёт очистки командой purge_users.
+
+    Сам аккаунт сразу отключается, а посты, комментарии и подписки
+    удаляются потом небольшими пачками, не блокируя базу.
+    """
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='deletion',
+        on_delete=models.CASCADE,
+    )
+    requested = models.DateTimeField('Запрошено', auto_now_add=True)
+    purged = models.PositiveIntegerField('Удалено строк', default=0)
+
+    class Meta:
+        verbose_name = 'Удаление пользователя'
+        verbose_name_plural = 'Удаления пользователей'
+
+    def __str__(self):
+        return f'{self.user_id}: удалено {self.purged}'
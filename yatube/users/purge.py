@@ -0,0 +1,102 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q
+from sorl.thumbnail import delete as delete_image
+
+from core.composition import invalidate_pages
+from posts import cached
+from posts.likes import change_likes
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Follow, Like, Mention, Post,
+)
+
+from .models import User, UserDeletion
+
+PURGE_BATCH_SIZE: int = 500
+
+
+def soft_delete(user):
+    """Отключает аккаунт сразу, а его содержимое ставит в очередь."""
+    with transaction.atomic():
+        # Неактивный пользователь не войдёт, и его сессии перестанут
+        # проходить проверку в ModelBackend.
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        UserDeletion.objects.get_or_create(user=user)
+    cached.users.forget([user.pk])
+    invalidate_pages()
+
+
+def _delete_images(rows):
+    images = [row.image for row in rows if row.image]
+
+    def delete():
+        for image in images:
+            delete_image(image)
+
+    # Файлы удаляем только после коммита пачки.
+    transaction.on_commit(delete)
+
+
+def _forget_likes(rows):
+    for post_id, count in Counter(row.post_id for row in rows).items():
+        change_likes(post_id, -count)
+
+
+def delete_batches(queryset, batch_size, prepare=None):
+    """Удаляет строки выборки пачками, каждую в своей транзакции.
+
+    prepare(rows) вызывается в транзакции пачки перед удалением.
+    Отдаёт число удалённых строк с учётом каскада.
+    """
+    model = queryset.model
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.order_by('pk')[:batch_size])
+            if not rows:
+                return
+            if prepare is not None:
+                prepare(rows)
+            deleted, _ = model.objects.filter(
+                pk__in=[row.pk for row in rows]).delete()
+        yield deleted
+
+
+def purge_stages(user_id):
+    """Этапы очистки: (название, выборка, подготовка пачки).
+
+    Сначала удаляется всё, что ссылается на посты пользователя,
+    чтобы каскад при удалении пачки постов оставался маленьким.
+    """
+    return [
+        ('подписки', Follow.objects.filter(
+            Q(user_id=user_id) | Q(author_id=user_id)), None),
+        ('лайки', Like.objects.filter(user_id=user_id), _forget_likes),
+        ('упоминания', Mention.objects.filter(user_id=user_id), None),
+        ('комментарии', Comment.objects.filter(author_id=user_id), None),
+        ('комментарии к постам', Comment.objects.filter(
+            post__author_id=user_id), None),
+        ('лайки постов', Like.objects.filter(post__author_id=user_id), None),
+        ('посты', Post.objects.filter(author_id=user_id), _delete_images),
+        ('архивные комментарии', ArchivedComment.objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)), None),
+        ('архивные посты', ArchivedPost.objects.filter(
+            author_id=user_id), _delete_images),
+    ]
+
+
+def purge_user(deletion, batch_size=PURGE_BATCH_SIZE):
+    """Очищает содержимое пользователя, отдавая ход работы.
+
+    Отдаёт пары (этап, удалено строк); прогресс копится в
+    UserDeletion.purged, так что прерванную очистку можно продолжить.
+    """
+    for stage, queryset, prepare in purge_stages(deletion.user_id):
+        for deleted in delete_batches(queryset, batch_size, prepare):
+            UserDeletion.objects.filter(pk=deletion.pk).update(
+                purged=F('purged') + deleted)
+            deletion.purged += deleted
+            yield stage, deleted
+    # Остались только мелкие связи: счётчики, отметки, очередь.
+    User.objects.filter(pk=deletion.user_id).delete()
+    invalidate_pages()
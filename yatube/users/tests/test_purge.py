@@ -0,0 +1,99 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.likes import like, likes_counts
+from posts.models import Comment, Follow, Post
+
+from ..models import UserDeletion
+from ..purge import purge_user, soft_delete
+
+User = get_user_model()
+
+
+class PurgeUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='leaving')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='admin')
+        cls.other_post = Post.objects.create(
+            author=cls.reader, text='Пост читателя')
+        for number in range(5):
+            post = Post.objects.create(author=cls.user, text=f'Пост {number}')
+            Comment.objects.create(
+                post=post, author=cls.reader, text='Комментарий')
+        Comment.objects.create(
+            post=cls.other_post, author=cls.user, text='Свой комментарий')
+        like(cls.user, cls.other_post)
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_admin_delete_is_soft(self):
+        """Удаление из админки отключает пользователя, не трогая посты."""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.post(
+            reverse('admin:auth_user_delete', args=[self.user.pk]),
+            {'post': 'yes'},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertTrue(UserDeletion.objects.filter(user=self.user).exists())
+        self.assertEqual(Post.objects.filter(author=self.user).count(), 5)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'leaving'}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_soft_deleted_hidden_from_feeds(self):
+        """До очистки посты и комментарии ушедшего уже не видны."""
+        self.assertContains(self.client.get(reverse('posts:index')), 'Пост 0')
+        soft_delete(self.user)
+        # Фрагмент главной живёт свои 20 секунд при любом удалении.
+        cache.clear()
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:trending'),
+            reverse('posts:post_detail', args=[self.other_post.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(response, 'Пост 0')
+                self.assertNotContains(response, 'Свой комментарий')
+        post = Post.objects.filter(author=self.user).first()
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Post.objects.published().filter(
+            author=self.user).exists())
+
+    def test_purge_in_batches(self):
+        """Очистка идёт пачками и удаляет всё содержимое пользователя."""
+        soft_delete(self.user)
+        deletion = UserDeletion.objects.get(user=self.user)
+        stages = list(purge_user(deletion, batch_size=2))
+        self.assertIn(('посты', 4), stages)
+        self.assertEqual(
+            deletion.purged, sum(deleted for _, deleted in stages))
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(list(Post.objects.all()), [self.other_post])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertEqual(likes_counts([self.other_post.pk]),
+                         {self.other_post.pk: 0})
+
+    def test_command_reports_progress(self):
+        soft_delete(self.user)
+        out = StringIO()
+        call_command('purge_users', batch_size=100, stdout=out)
+        self.assertIn('leaving: посты', out.getvalue())
+        self.assertIn('leaving: удалён', out.getvalue())
@@ -31,6 +31,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,12 +72,51 @@ DATABASES = {
     }
 }
 
+# Реплики для чтения лент. YATUBE_REPLICAS=2 заводит две копии SQLite,
+# которые догоняет команда replicate.
+DATABASE_REPLICAS = [
+    f'replica{number}'
+    for number in range(1, int(os.environ.get('YATUBE_REPLICAS', 0)) + 1)
+]
+for alias in DATABASE_REPLICAS:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db_{alias}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# YATUBE_AUX_DB=1 уносит сессии и KV-хранилище миниатюр в отдельный
+# файл; таблицы в нём создаёт migrate --database aux.
+if os.environ.get('YATUBE_AUX_DB'):
+    DATABASES['aux'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db_aux.sqlite3'),
+    }
+
+DATABASE_ROUTERS = [
+    'core.routers.AuxRouter',
+    'core.routers.ReplicaRouter',
+]
+
+# Перед общим кэшем стоит LRU в памяти процесса (core.tiered).
+# Общий кэш задаётся YATUBE_CACHE_BACKEND и YATUBE_CACHE_LOCATION,
+# например memcached; по умолчанию это LocMemCache.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.tiered.TieredCache',
+        'LOCATION': 'shared',
+    },
+    'shared': {
+        'BACKEND': os.environ.get(
+            'YATUBE_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('YATUBE_CACHE_LOCATION', ''),
+    },
 }
 
+# Время жизни страниц в кэше без пользовательских фрагментов, 0 — отключить
+PAGE_CACHE_TIMEOUT = 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -108,6 +149,9 @@ USE_TZ = False
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+# Хэш содержимого в именах файлов и сжатые копии .br/.gz
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_static
 
 
 urlpatterns = [
@@ -12,6 +15,11 @@ urlpatterns = [
     # Django пойдёт искать его в django.contrib.auth
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+        serve_static,
+        name='static'
+    ),
 ]
 
 